@@ -4,12 +4,42 @@ Script to check if Ollama is running and available.
 This is useful to run before starting the agent to ensure Ollama is ready.
 """
 import sys
+import random
 import requests
 import time
+from typing import Any, Dict
+from requests.adapters import HTTPAdapter
 from src.config import config
 
-def check_ollama():
-    """Check if Ollama is running and available."""
+# Prefer orjson for decoding the tag list, falling back to the standard library
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+# Shared session so the retry loop reuses the same keep-alive connection
+_SESSION = requests.Session()
+_SESSION.headers["Connection"] = "keep-alive"
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=0)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+# Parsed /api/tags results, keyed by Ollama URL:
+# {"fetched_at": monotonic time, "etag": ETag header or None, "models": frozenset of names}
+_TAGS_CACHE: Dict[str, Dict[str, Any]] = {}
+_TAGS_TTL = 30.0  # seconds
+
+def check_ollama(force=False, verify_model=True):
+    """
+    Check if Ollama is running and available.
+    
+    Args:
+        force: Ignore any cached model list and query the server again
+        verify_model: Also check that the configured model has been pulled.
+            When False only a cheap HEAD liveness probe is made.
+    """
     ollama_url = config.get("ollama.base_url", "http://localhost:11434")
     ollama_model = config.get("ollama.default_model", "llama3")
     
@@ -17,19 +47,47 @@ def check_ollama():
     
     # Try to connect to Ollama
     try:
-        # Check if Ollama API is responding
-        response = requests.get(f"{ollama_url}/api/tags")
-        if response.status_code != 200:
-            print(f"Error: Ollama API returned status code {response.status_code}")
-            return False
+        if not verify_model:
+            # Any response other than a server error means Ollama is up
+            response = _SESSION.head(ollama_url, timeout=1.0)
+            if response.status_code >= 500:
+                print(f"Error: Ollama API returned status code {response.status_code}")
+                return False
+            
+            print("Ollama is running.")
+            return True
         
-        # Check if the configured model is available
-        models = response.json().get("models", [])
-        model_names = [model.get("name") for model in models]
+        now = time.monotonic()
+        cached = _TAGS_CACHE.get(ollama_url)
+        if not force and cached and now - cached["fetched_at"] < _TAGS_TTL:
+            model_names = cached["models"]
+        else:
+            # Revalidate a stale list instead of downloading it again when we have an ETag
+            headers = {}
+            if cached and cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            
+            # Check if Ollama API is responding
+            response = _SESSION.get(f"{ollama_url}/api/tags", headers=headers, timeout=(1.0, 3.0))
+            if response.status_code == 304 and cached:
+                model_names = cached["models"]
+                cached["fetched_at"] = now
+            elif response.status_code != 200:
+                print(f"Error: Ollama API returned status code {response.status_code}")
+                return False
+            else:
+                models = _loads(response.content).get("models") or []
+                model_names = frozenset(model.get("name") for model in models)
+                _TAGS_CACHE[ollama_url] = {
+                    "fetched_at": now,
+                    "etag": response.headers.get("ETag"),
+                    "models": model_names,
+                }
         
+        # Check if the configured model is available
         if ollama_model not in model_names:
             print(f"Warning: Model '{ollama_model}' not found in available models.")
-            print(f"Available models: {', '.join(model_names)}")
+            print(f"Available models: {', '.join(sorted(name for name in model_names if name))}")
             print(f"You may need to run: ollama pull {ollama_model}")
             return False
         
@@ -48,15 +106,19 @@ def check_ollama():
 def main():
     """Main function."""
     max_retries = 3
-    retry_delay = 2  # seconds
+    retry_delay = 2  # seconds, doubled on each attempt
     
     for attempt in range(1, max_retries + 1):
-        if check_ollama():
+        # Wait for the server with the cheap HEAD probe; the model list is only fetched
+        # once it answers. Retries must see fresh state, not the list cached by the failed attempt.
+        if check_ollama(verify_model=False) and check_ollama(force=attempt > 1):
             sys.exit(0)
         
         if attempt < max_retries:
-            print(f"Retrying in {retry_delay} seconds... (Attempt {attempt}/{max_retries})")
-            time.sleep(retry_delay)
+            # Exponential backoff with +/-20% jitter so concurrent starts don't retry in lockstep
+            delay = retry_delay * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+            print(f"Retrying in {delay:.1f} seconds... (Attempt {attempt}/{max_retries})")
+            time.sleep(delay)
     
     print("Failed to connect to Ollama after multiple attempts.")
     sys.exit(1)
@@ -2,67 +2,280 @@
 """
 Example script showing how to use the Ollama Weather Agent directly from Python code.
 This is useful for integrating the agent into other applications without using the API.
+
+Queries piped on stdin (one per line) are answered concurrently, up to
+OLLAMA_NUM_PARALLEL at a time (default 4). Start Ollama with the same
+OLLAMA_NUM_PARALLEL value so it actually serves them in parallel.
 """
 import os
 import sys
-import json
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 import re
+import bisect
+import sqlite3
+import threading
+from functools import lru_cache
 import requests
-import urllib.parse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import warnings
 import logging
 from datetime import datetime, timedelta
-import io
+import contextlib
 
-# Suppress all warnings
-warnings.filterwarnings("ignore")
+# Add the project root to the Python path so the src package is importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Suppress urllib3 warnings about OpenSSL
-warnings.filterwarnings("ignore", category=Warning, module="urllib3")
+# LLM JSON parsing and clothing advice are shared with the API so both front ends agree
+from src.llm_json import parse_llm_json
+from src.clothing import recommendations_for, weather_condition
 
-# Suppress LangChain deprecation warnings
-warnings.filterwarnings("ignore", category=DeprecationWarning)
-warnings.filterwarnings("ignore", message=".*deprecated.*")
+# Suppress all warnings (including urllib3's OpenSSL and LangChain's deprecation warnings)
+warnings.simplefilter("ignore")
 
 # Disable logging for specific modules
-logging.getLogger("urllib3").setLevel(logging.ERROR)
-logging.getLogger("requests").setLevel(logging.ERROR)
-logging.getLogger("langchain").setLevel(logging.ERROR)
-logging.getLogger("langchain_core").setLevel(logging.ERROR)
-logging.getLogger("langchain_community").setLevel(logging.ERROR)
-
-# Redirect stdout and stderr to suppress print statements during imports
-original_stdout = sys.stdout
-original_stderr = sys.stderr
-null_output = io.StringIO()
-sys.stdout = null_output
-sys.stderr = null_output
+for _logger_name in ("urllib3", "requests", "langchain", "langchain_core", "langchain_community"):
+    logging.getLogger(_logger_name).setLevel(logging.ERROR)
 
+# Prefer orjson for parsing LLM and API responses, falling back to the standard library
 try:
-    # Add the project root to the Python path
-    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
 
-    # Import LangChain components
-    try:
-        # Try to import OllamaLLM from langchain_ollama (recommended)
-        from langchain_ollama import OllamaLLM
-        # Suppressed: print("Using OllamaLLM from langchain_ollama")
-    except ImportError:
-        # Fall back to deprecated import if langchain_ollama is not installed
-        from langchain_community.llms import Ollama as OllamaLLM
-        # Suppressed: print("Warning: Using deprecated Ollama import...")
+# Set debug mode (set to True to show debug prints)
+DEBUG = False
+
+# Diagnostics go through logging so messages are only formatted when their level is enabled
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG if DEBUG else logging.WARNING)
+if DEBUG:
+    logger.addHandler(logging.StreamHandler())
+
+# Routes queries to the weather branch locally, so the LLM is never asked to classify them
+_WEATHER_INTENT_RE = re.compile(r"\b(?:weather|forecast|temperature|rain|snow|humidity|wind)\b", re.IGNORECASE)
+
+# Patterns used on every query, compiled once
+_WS_RE = re.compile(r'\s+')
+_LOCATION_KV_RE = re.compile(r'location["\s:]+([^"}\s]+|"[^"]+")(?:\s*})?', re.IGNORECASE)
+_WEATHER_IN_RE = re.compile(r'weather\s+(?:in|for|at|of)\s+([A-Za-z\s,]+)(?:\s|$|\.|\?)', re.IGNORECASE)
+_COORDS_RE = re.compile(r'(-?\d+\.?\d*)[,\s]+(-?\d+\.?\d*)')
+_NONWORD_RE = re.compile(r'[^\w\s]')
+_CITY_RE = re.compile(r'([A-Za-z]+)')
+_QUESTION_WORDS = frozenset({"how", "what", "when", "where", "why", "is", "can", "will", "should"})
+# Forecast entries are grouped by hour: before 12 is morning, before 18 afternoon, then evening
+_TIME_BLOCK_HOURS = (12, 18)
+_TIME_BLOCK_NAMES = ("Morning", "Afternoon", "Evening")
+
+# Prompt for general queries
+# Weather routing is decided before the LLM is called, so the prompt doesn't ask it to classify
+GENERAL_PROMPT = """
+You are a helpful AI assistant.
+Respond helpfully to the user's query based on your knowledge.
+
+User query: {query}
+
+Your response:
+"""
+
+# Prompt for location extraction with improved JSON formatting
+# Note: Double curly braces {{ }} are used to escape actual curly braces in the template
+LOCATION_RESOLUTION_PROMPT = """
+Your task is to extract ONLY the location from the user query.
+
+User query: {query}
+
+INSTRUCTIONS:
+1. Identify the location mentioned in the query
+2. Return ONLY a valid JSON object with this exact format: {{"location": "EXTRACTED_LOCATION"}}
+3. Replace EXTRACTED_LOCATION with the actual location from the query
+4. If no location is found, use: {{"location": "Unknown"}}
+5. Do not include any explanations, notes, or additional text
+6. Ensure the JSON is properly formatted with double quotes
+7. Ignore punctuation like commas, periods, and question marks when extracting the location
+8. Keep multi-word locations together (e.g., "New York", "London Waterloo")
+9. For specific locations like stations or neighborhoods, include the city name (e.g., "London Waterloo" or "Waterloo, London")
+
+EXAMPLE OUTPUTS:
+{{"location": "London"}}
+{{"location": "New York City"}}
+{{"location": "London Waterloo"}}
+{{"location": "London, UK"}}
+{{"location": "Unknown"}}
 
+EXAMPLE INPUTS AND EXPECTED OUTPUTS:
+Input: "What's the weather like in Paris?"
+Output: {{"location": "Paris"}}
+
+Input: "Hey, how is the weather in London Waterloo today?"
+Output: {{"location": "London Waterloo"}}
+
+Input: "Will it rain tomorrow in San Francisco, California?"
+Output: {{"location": "San Francisco, California"}}
+
+YOUR RESPONSE (ONLY JSON):
+"""
+
+# Prompt for LLM geocoding, formatted with the location on each call
+GEOCODING_PROMPT = """
+You are a helpful assistant that provides accurate latitude and longitude coordinates for locations.
+
+Location: {location}
+
+Please provide the latitude and longitude coordinates for this location in the following JSON format:
+{{"latitude": LATITUDE_VALUE, "longitude": LONGITUDE_VALUE}}
+
+Replace LATITUDE_VALUE and LONGITUDE_VALUE with the actual numerical coordinates.
+Use decimal degrees with 6 decimal places of precision.
+Do not include any explanations or additional text, only return the JSON object.
+
+If you're not sure about the exact coordinates, provide your best estimate.
+"""
+
+@lru_cache(maxsize=None)
+def _chain_components():
+    """Build the prompt templates and output parser once; LangChain is imported on first use."""
     from langchain_core.prompts import PromptTemplate
-    from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
-    from langchain_core.runnables import RunnablePassthrough, RunnableSequence
+    from langchain_core.output_parsers import StrOutputParser
+    
+    location_resolution_prompt = PromptTemplate(template=LOCATION_RESOLUTION_PROMPT, input_variables=["query"])
+    general_prompt = PromptTemplate(template=GENERAL_PROMPT, input_variables=["query"])
+    return location_resolution_prompt, general_prompt, StrOutputParser()
 
-    # Import project components
-    from src.tools.weather_tool import WeatherTool
-    from src.config import config
-finally:
-    # Restore stdout and stderr
-    sys.stdout = original_stdout
-    sys.stderr = original_stderr
+def build_chains(llm):
+    """
+    Build the chains used to answer queries with the given LLM.
+    
+    The prompt templates and parser are shared, so calling this again for another
+    LLM instance (e.g. once per application startup) only composes the chains.
+    
+    Args:
+        llm: The LLM instance to use
+        
+    Returns:
+        Tuple of (location_resolution_chain, general_query_chain), both invoked with {"query": ...}
+    """
+    location_resolution_prompt, general_prompt, str_parser = _chain_components()
+    
+    # StrOutputParser returns the raw text; the location JSON is parsed by parse_llm_json
+    location_resolution_chain = location_resolution_prompt | llm | str_parser
+    general_query_chain = general_prompt | llm | str_parser
+    return location_resolution_chain, general_query_chain
+
+# Exact-match cache for general (non-weather) answers: key -> (stored_at, response)
+RESPONSE_CACHE_TTL = 1800  # seconds
+CACHE_MAX_ENTRIES = 4096
+_response_cache = {}
+
+def _cache_get(cache, key, ttl):
+    """Return a cached value if it is younger than ttl seconds, otherwise None."""
+    entry = cache.get(key)
+    if entry and time.monotonic() - entry[0] < ttl:
+        return entry[1]
+    return None
+
+def _cache_set(cache, key, value):
+    """Store a value in a cache, evicting the oldest entry when the cache is full."""
+    if key not in cache and len(cache) >= CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+    cache[key] = (time.monotonic(), value)
+
+# Shared session so geocoding, weather and forecast calls reuse keep-alive connections
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=2, backoff_factor=0.2))
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+HTTP_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
+# Successful geocoding lookups are kept in memory for the session. Results from the geocoding
+# API are also kept in a small SQLite database that survives restarts, keyed by location and a
+# hash of the API key and expired after GEOCODE_DB_TTL. LLM guesses are never written to disk,
+# and failures are not cached so transient errors can be retried.
+GEOCODE_DB_PATH = os.path.expanduser("~/.morning_planner_geocache.db")
+GEOCODE_DB_TTL = 30 * 86400  # seconds
+_GEOCODE_CACHE = {}  # (source, location) -> (lat, lon), source is "llm" or "api"
+_geocode_db = None
+_geocode_db_lock = threading.Lock()
+
+def _get_geocode_db():
+    """Open the geocoding database on first use. Must be called with _geocode_db_lock held."""
+    global _geocode_db
+    if _geocode_db is None:
+        # Weather queries run in worker threads; access is serialised by _geocode_db_lock
+        _geocode_db = sqlite3.connect(GEOCODE_DB_PATH, check_same_thread=False)
+        _geocode_db.execute("PRAGMA journal_mode=WAL")
+        _geocode_db.execute(
+            "CREATE TABLE IF NOT EXISTS api_geo (loc TEXT, key_hash TEXT, lat REAL, lon REAL, stored_at REAL, "
+            "PRIMARY KEY (loc, key_hash))"
+        )
+    return _geocode_db
+
+def _api_key_hash(api_key):
+    """Hash the API key so it is part of the on-disk cache key without being stored."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+def _cached_geocode(source, location, api_key=None):
+    """
+    Look up a previously geocoded location, in memory first and then, for API results, on disk.
+    
+    Args:
+        source: "llm" or "api"
+        location: Location name as passed to the geocoder
+        api_key: OpenWeatherMap API key the API result was fetched with
+        
+    Returns:
+        Tuple of (latitude, longitude) if cached, None otherwise
+    """
+    coordinates = _GEOCODE_CACHE.get((source, location))
+    if coordinates or source != "api" or not api_key:
+        return coordinates
+    
+    try:
+        with _geocode_db_lock:
+            row = _get_geocode_db().execute(
+                "SELECT lat, lon FROM api_geo WHERE loc = ? AND key_hash = ? AND stored_at > ?",
+                (location, _api_key_hash(api_key), time.time() - GEOCODE_DB_TTL)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.debug("Geocoding cache lookup failed: %s", e)
+        return None
+    
+    if row:
+        _GEOCODE_CACHE[(source, location)] = row
+    return row
+
+def _store_geocode(source, location, coordinates, api_key=None):
+    """Remember a successful geocoding result in memory and, for API results, on disk."""
+    _GEOCODE_CACHE[(source, location)] = coordinates
+    if source != "api" or not api_key:
+        return
+    
+    try:
+        with _geocode_db_lock:
+            db = _get_geocode_db()
+            db.execute(
+                "INSERT OR REPLACE INTO api_geo VALUES (?, ?, ?, ?, ?)",
+                (location, _api_key_hash(api_key)) + tuple(coordinates) + (time.time(),)
+            )
+            db.commit()
+    except sqlite3.Error as e:
+        logger.debug("Geocoding cache write failed: %s", e)
+
+# Current conditions change slowly enough to reuse for back-to-back queries
+WEATHER_CACHE_TTL = 60  # seconds
+_WEATHER_CACHE = {}  # (lat, lon, units) -> (stored_at, (weather_str, data))
+
+def _response_cache_key(model, query):
+    """
+    Build the cache key for a model/query pair. The prompt template is part of the key,
+    so editing GENERAL_PROMPT never serves answers to the old prompt.
+    """
+    return hashlib.sha256(f"{model}\0{GENERAL_PROMPT}\0{query}".encode()).hexdigest()
 
 def preprocess_query(query):
     """
@@ -78,10 +291,12 @@ def preprocess_query(query):
     query = query.strip()
     
     # Replace multiple spaces with a single space
-    query = re.sub(r'\s+', ' ', query)
+    query = _WS_RE.sub(' ', query)
     
     # Ensure the query ends with a question mark if it's a question
-    if any(query.lower().startswith(q) for q in ["how", "what", "when", "where", "why", "is", "can", "will", "should"]) and not query.endswith("?"):
+    # (the first word decides, with contractions such as "what's" reduced to "what")
+    first_word = query.split(' ', 1)[0].split("'", 1)[0].lower()
+    if first_word in _QUESTION_WORDS and not query.endswith("?"):
         query = query + "?"
     
     return query
@@ -92,21 +307,14 @@ def extract_location_from_text(text):
     Attempts to find JSON structure or extract location using regex patterns.
     """
     # Try to parse as JSON first
-    try:
-        # Find JSON-like structure in the text
-        json_match = re.search(r'\{.*\}', text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            data = json.loads(json_str)
-            if "location" in data:
-                return data["location"]
-    except Exception as e:
-        print(f"JSON extraction failed: {str(e)}")
+    data = parse_llm_json(text, ("location",))
+    if data:
+        return data["location"]
     
     # Fallback: Try to extract location using regex patterns
     try:
         # Look for patterns like 'location: "New York"' or 'location: New York'
-        location_match = re.search(r'location["\s:]+([^"}\s]+|"[^"]+")(?:\s*})?', text, re.IGNORECASE)
+        location_match = _LOCATION_KV_RE.search(text)
         if location_match:
             location = location_match.group(1).strip('"')
             return location
@@ -116,7 +324,7 @@ def extract_location_from_text(text):
     # Try to extract location from common weather query patterns
     try:
         # Look for patterns like "weather in [location]" or "weather for [location]"
-        weather_match = re.search(r'weather\s+(?:in|for|at|of)\s+([A-Za-z\s,]+)(?:\s|$|\.|\?)', text, re.IGNORECASE)
+        weather_match = _WEATHER_IN_RE.search(text)
         if weather_match:
             return weather_match.group(1).strip()
     except Exception:
@@ -138,88 +346,51 @@ def llm_geocode_location(location, llm):
         Tuple of (latitude, longitude) if successful, None if failed
     """
     if not location:
-        print("Error: No location provided for geocoding")
+        logger.warning("Error: No location provided for geocoding")
         return None
     
+    cached = _cached_geocode("llm", location)
+    if cached:
+        logger.debug("Using cached LLM geocoding for %r: %s", location, cached)
+        return cached
+    
     try:
         # Create a prompt for geocoding
-        geocoding_prompt = f"""
-        You are a helpful assistant that provides accurate latitude and longitude coordinates for locations.
-        
-        Location: {location}
-        
-        Please provide the latitude and longitude coordinates for this location in the following JSON format:
-        {{"latitude": LATITUDE_VALUE, "longitude": LONGITUDE_VALUE}}
-        
-        Replace LATITUDE_VALUE and LONGITUDE_VALUE with the actual numerical coordinates.
-        Use decimal degrees with 6 decimal places of precision.
-        Do not include any explanations or additional text, only return the JSON object.
+        geocoding_prompt = GEOCODING_PROMPT.format(location=location)
         
-        If you're not sure about the exact coordinates, provide your best estimate.
-        """
-        
-        print(f"Asking LLM for coordinates of '{location}'...")
+        logger.debug("Asking LLM for coordinates of %r...", location)
         
         # Get the response from the LLM
         response = llm.invoke(geocoding_prompt)
-        print(f"LLM geocoding response: {response}")
+        logger.debug("LLM geocoding response: %s", response)
         
-        # Try to extract JSON from the response
-        try:
-            # Look for JSON pattern in the response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                data = json.loads(json_str)
-                
-                # Extract latitude and longitude
-                lat = data.get("latitude")
-                lon = data.get("longitude")
-                
-                if lat is not None and lon is not None:
-                    # Convert to float if they're strings
-                    if isinstance(lat, str):
-                        lat = float(lat)
-                    if isinstance(lon, str):
-                        lon = float(lon)
-                        
-                    print(f"LLM geocoded '{location}' to coordinates: ({lat}, {lon})")
-                    return (lat, lon)
-            
-            # If JSON pattern not found or missing keys, try to parse the whole response
-            data = json.loads(response)
-            lat = data.get("latitude")
-            lon = data.get("longitude")
-            
-            if lat is not None and lon is not None:
-                # Convert to float if they're strings
-                if isinstance(lat, str):
-                    lat = float(lat)
-                if isinstance(lon, str):
-                    lon = float(lon)
-                    
-                print(f"LLM geocoded '{location}' to coordinates: ({lat}, {lon})")
+        # Try to extract the coordinates as JSON from the response
+        data = parse_llm_json(response, ("latitude", "longitude"), ("latitude", "longitude"))
+        if data:
+            lat, lon = data["latitude"], data["longitude"]
+            logger.debug("LLM geocoded %r to coordinates: (%s, %s)", location, lat, lon)
+            _store_geocode("llm", location, (lat, lon))
+            return (lat, lon)
+        
+        logger.debug("Failed to parse LLM geocoding response as JSON")
+        
+        # Try to extract coordinates using regex
+        coords_match = _COORDS_RE.search(response)
+        if coords_match:
+            try:
+                lat = float(coords_match.group(1))
+                lon = float(coords_match.group(2))
+                logger.debug("Extracted coordinates from text: (%s, %s)", lat, lon)
+                _store_geocode("llm", location, (lat, lon))
                 return (lat, lon)
-                
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Failed to parse LLM geocoding response: {str(e)}")
-            
-            # Try to extract coordinates using regex
-            coords_match = re.search(r'(-?\d+\.?\d*)[,\s]+(-?\d+\.?\d*)', response)
-            if coords_match:
-                try:
-                    lat = float(coords_match.group(1))
-                    lon = float(coords_match.group(2))
-                    print(f"Extracted coordinates from text: ({lat}, {lon})")
-                    return (lat, lon)
-                except ValueError:
-                    pass
+            except ValueError:
+                pass
         
-        print(f"LLM could not provide valid coordinates for '{location}'")
+        logger.debug("LLM could not provide valid coordinates for %r", location)
         return None
         
     except Exception as e:
-        print(f"Error during LLM geocoding: {str(e)}")
+        logger.debug("Error during LLM geocoding: %s", e)
         return None
 
 def normalize_location(location):
@@ -242,7 +413,7 @@ def normalize_location(location):
     variations = [location]  # Start with the original location
     
     # Add variations without special characters
-    clean_location = re.sub(r'[^\w\s]', '', location)
+    clean_location = _NONWORD_RE.sub('', location)
     if clean_location != location:
         variations.append(clean_location)
     
@@ -258,13 +429,8 @@ def normalize_location(location):
                 variations.append(city_country[0].strip())  # Just the city
                 variations.append(city_country[1].strip())  # Just the country
     
-    # Remove duplicates while preserving order
-    unique_variations = []
-    for var in variations:
-        if var not in unique_variations:
-            unique_variations.append(var)
-    
-    return unique_variations
+    # Remove duplicates (and empty parts) while preserving order
+    return list(dict.fromkeys(var for var in variations if var))
 
 def api_geocode_location(location, api_key):
     """
@@ -279,25 +445,26 @@ def api_geocode_location(location, api_key):
         Tuple of (latitude, longitude) if successful, None if failed
     """
     if not location or not api_key:
-        print("Error: Location or API key not provided for geocoding")
+        logger.warning("Error: Location or API key not provided for geocoding")
         return None
     
+    cached = _cached_geocode("api", location, api_key)
+    if cached:
+        logger.debug("Using cached API geocoding for %r: %s", location, cached)
+        return cached
+    
     # Get location variations to try
     location_variations = normalize_location(location)
-    print(f"Trying location variations with API: {location_variations}")
+    logger.debug("Trying location variations with API: %s", location_variations)
     
     # Try each location variation
     for variation in location_variations:
         try:
-            print(f"Trying to geocode with API: '{variation}'")
+            logger.debug("Trying to geocode with API: %r", variation)
             
             # OpenWeatherMap geocoding API endpoint
             geocoding_url = "http://api.openweathermap.org/geo/1.0/direct"
             
-            # URL encode the location parameter to handle spaces and special characters
-            encoded_location = urllib.parse.quote(variation)
-            print(f"URL encoded location: '{encoded_location}'")
-            
             # Parameters for the geocoding API
             params = {
                 "q": variation,  # The requests library will handle URL encoding
@@ -306,27 +473,28 @@ def api_geocode_location(location, api_key):
             }
             
             # Make the API request
-            response = requests.get(geocoding_url, params=params)
+            response = _SESSION.get(geocoding_url, params=params, timeout=HTTP_TIMEOUT)
             response.raise_for_status()  # Raise exception for HTTP errors
             
             # Parse the response
-            data = response.json()
-            print(f"Geocoding API response for '{variation}': {data}")
+            data = _loads(response.content)
+            logger.debug("Geocoding API response for %r: %s", variation, data)
             
             # Check if we got any results
             if data and len(data) > 0:
                 lat = data[0].get("lat")
                 lon = data[0].get("lon")
                 if lat is not None and lon is not None:
-                    print(f"Successfully geocoded '{variation}' to coordinates: ({lat}, {lon})")
+                    logger.debug("Successfully geocoded %r to coordinates: (%s, %s)", variation, lat, lon)
+                    _store_geocode("api", location, (lat, lon), api_key)
                     return (lat, lon)
             
-            print(f"No results found for '{variation}'")
+            logger.debug("No results found for %r", variation)
             
         except Exception as e:
-            print(f"Error geocoding '{variation}': {str(e)}")
+            logger.debug("Error geocoding %r: %s", variation, e)
     
-    print(f"Could not geocode any variation of '{location}' with API")
+    logger.warning("Could not geocode any variation of %r with API", location)
     return None
 
 def get_weather_by_coordinates(lat, lon, api_key, units="metric"):
@@ -345,6 +513,12 @@ def get_weather_by_coordinates(lat, lon, api_key, units="metric"):
     if not api_key:
         return "Error: OpenWeather API key not configured.", None
     
+    cache_key = (lat, lon, units)
+    cached = _cache_get(_WEATHER_CACHE, cache_key, WEATHER_CACHE_TTL)
+    if cached:
+        logger.debug("Using cached weather for (%s, %s)", lat, lon)
+        return cached
+    
     try:
         # OpenWeatherMap current weather API endpoint
         weather_url = "https://api.openweathermap.org/data/2.5/weather"
@@ -358,14 +532,16 @@ def get_weather_by_coordinates(lat, lon, api_key, units="metric"):
         }
         
         # Make the API request
-        response = requests.get(weather_url, params=params)
+        response = _SESSION.get(weather_url, params=params, timeout=HTTP_TIMEOUT)
         response.raise_for_status()  # Raise exception for HTTP errors
         
         # Parse the response
-        data = response.json()
+        data = _loads(response.content)
         
         # Format the weather data
-        return format_weather_data(data, units), data
+        result = (format_weather_data(data, units), data)
+        _cache_set(_WEATHER_CACHE, cache_key, result)
+        return result
         
     except Exception as e:
         return f"Error fetching weather data: {str(e)}", None
@@ -399,11 +575,11 @@ def get_forecast_by_coordinates(lat, lon, api_key, units="metric"):
         }
         
         # Make the API request
-        response = requests.get(forecast_url, params=params)
+        response = _SESSION.get(forecast_url, params=params, timeout=HTTP_TIMEOUT)
         response.raise_for_status()  # Raise exception for HTTP errors
         
         # Parse the response
-        data = response.json()
+        data = _loads(response.content)
         
         # Extract forecast for the rest of the day
         today_forecast = extract_today_forecast(data)
@@ -426,21 +602,20 @@ def extract_today_forecast(forecast_data):
     if not forecast_data or "list" not in forecast_data:
         return []
     
-    # Get the current date
-    current_date = datetime.now().date()
+    # Get the current time and date once for the whole list
+    now = datetime.now()
+    current_date = now.date()
     
     # Extract forecast entries for today
     today_forecast = []
     for entry in forecast_data["list"]:
         # Convert timestamp to datetime
-        timestamp = entry["dt"]
-        entry_date = datetime.fromtimestamp(timestamp).date()
-        entry_time = datetime.fromtimestamp(timestamp).time()
+        entry_datetime = datetime.fromtimestamp(entry["dt"])
         
         # Check if this entry is for today and in the future
-        if entry_date == current_date and datetime.fromtimestamp(timestamp) > datetime.now():
+        if entry_datetime.date() == current_date and entry_datetime > now:
             # Add a formatted time to the entry
-            entry["formatted_time"] = datetime.fromtimestamp(timestamp).strftime("%H:%M")
+            entry["formatted_time"] = entry_datetime.strftime("%H:%M")
             today_forecast.append(entry)
     
     return today_forecast
@@ -483,79 +658,24 @@ def get_clothing_recommendation(weather_data, forecast_data=None):
         return "I can't provide clothing recommendations without weather data."
     
     try:
-        # Get current time
-        current_time = datetime.now()
-        
-        # Initialize recommendations
-        current_recommendations = []
         forecast_recommendations = {}
         
         # Generate recommendations for current weather
-        # Extract relevant weather information
-        temp = weather_data["main"]["temp"]
-        description = weather_data["weather"][0]["description"].lower()
-        wind_speed = weather_data["wind"]["speed"]
-        
-        # Temperature-based recommendations
-        if temp < 0:
-            current_recommendations.append("heavy winter coat")
-            current_recommendations.append("hat, scarf, and gloves")
-            current_recommendations.append("thermal layers")
-            current_recommendations.append("insulated boots")
-        elif temp < 10:
-            current_recommendations.append("winter coat or heavy jacket")
-            current_recommendations.append("hat and gloves")
-            current_recommendations.append("warm layers")
-        elif temp < 15:
-            current_recommendations.append("light jacket or heavy sweater")
-            current_recommendations.append("long sleeves")
-        elif temp < 20:
-            current_recommendations.append("light sweater or long-sleeved shirt")
-        elif temp < 25:
-            current_recommendations.append("t-shirt or light top")
-            current_recommendations.append("light pants or jeans")
-        else:
-            current_recommendations.append("light, breathable clothing")
-            current_recommendations.append("shorts or light pants")
-            current_recommendations.append("sun protection")
-        
-        # Weather condition-based recommendations
-        if "rain" in description or "drizzle" in description or "shower" in description:
-            current_recommendations.append("raincoat or umbrella")
-            current_recommendations.append("waterproof shoes")
-        elif "snow" in description or "sleet" in description:
-            current_recommendations.append("waterproof boots")
-            current_recommendations.append("warm, waterproof jacket")
-        elif "thunderstorm" in description:
-            current_recommendations.append("stay indoors if possible")
-            current_recommendations.append("raincoat and umbrella if you must go out")
-        elif "clear" in description and temp > 20:
-            current_recommendations.append("sunglasses")
-            current_recommendations.append("sunscreen")
-            current_recommendations.append("hat for sun protection")
-        
-        # Wind-based recommendations
-        if wind_speed > 10:
-            current_recommendations.append("windbreaker or wind-resistant jacket")
+        current_recommendations = recommendations_for(
+            weather_data["main"]["temp"],
+            weather_condition(weather_data["weather"][0].get("id", 0)),
+            weather_data["wind"]["speed"],
+        )
         
         # Generate recommendations for forecast periods if available
         if forecast_data:
             # Group forecast periods into meaningful time blocks
-            time_blocks = {
-                "Morning": [],
-                "Afternoon": [],
-                "Evening": []
-            }
+            time_blocks = {name: [] for name in _TIME_BLOCK_NAMES}
             
             for entry in forecast_data:
-                entry_time = datetime.fromtimestamp(entry["dt"]).time()
-                
-                if entry_time.hour < 12:
-                    time_blocks["Morning"].append(entry)
-                elif entry_time.hour < 18:
-                    time_blocks["Afternoon"].append(entry)
-                else:
-                    time_blocks["Evening"].append(entry)
+                hour = datetime.fromtimestamp(entry["dt"]).hour
+                block_name = _TIME_BLOCK_NAMES[bisect.bisect_right(_TIME_BLOCK_HOURS, hour)]
+                time_blocks[block_name].append(entry)
             
             # Generate recommendations for each time block
             for block_name, entries in time_blocks.items():
@@ -566,44 +686,12 @@ def get_clothing_recommendation(weather_data, forecast_data=None):
                 middle_idx = len(entries) // 2
                 representative_entry = entries[middle_idx]
                 
-                block_recommendations = []
-                
-                # Extract weather information
-                temp = representative_entry["main"]["temp"]
-                description = representative_entry["weather"][0]["description"].lower()
-                wind_speed = representative_entry["wind"]["speed"]
-                
-                # Temperature-based recommendations
-                if temp < 0:
-                    block_recommendations.append("heavy winter coat")
-                    block_recommendations.append("hat, scarf, and gloves")
-                    block_recommendations.append("thermal layers")
-                elif temp < 10:
-                    block_recommendations.append("winter coat or heavy jacket")
-                    block_recommendations.append("hat and gloves")
-                elif temp < 15:
-                    block_recommendations.append("light jacket or heavy sweater")
-                elif temp < 20:
-                    block_recommendations.append("light sweater or long-sleeved shirt")
-                elif temp < 25:
-                    block_recommendations.append("t-shirt or light top")
-                else:
-                    block_recommendations.append("light, breathable clothing")
-                    block_recommendations.append("sun protection")
-                
-                # Weather condition-based recommendations
-                if "rain" in description or "drizzle" in description:
-                    block_recommendations.append("raincoat or umbrella")
-                elif "snow" in description:
-                    block_recommendations.append("waterproof boots")
-                elif "clear" in description and temp > 20:
-                    block_recommendations.append("sunglasses")
-                
-                # Wind-based recommendations
-                if wind_speed > 10:
-                    block_recommendations.append("windbreaker")
-                
-                forecast_recommendations[block_name] = block_recommendations
+                forecast_recommendations[block_name] = recommendations_for(
+                    representative_entry["main"]["temp"],
+                    weather_condition(representative_entry["weather"][0].get("id", 0)),
+                    representative_entry["wind"]["speed"],
+                    detailed=False,
+                )
         
         # Format the recommendations
         result = "Clothing recommendations:\n\n"
@@ -623,20 +711,246 @@ def get_clothing_recommendation(weather_data, forecast_data=None):
     except (KeyError, TypeError) as e:
         return f"Error generating clothing recommendations: {str(e)}"
 
-def main():
-    # Redirect stdout and stderr to suppress initialization messages
-    original_stdout = sys.stdout
-    original_stderr = sys.stderr
-    null_output = io.StringIO()
-    sys.stdout = null_output
-    sys.stderr = null_output
+def answer_weather_query(processed_query, location_resolution_chain, llm, api_key, units):
+    """
+    Answer a weather query: resolve the location, geocode it and fetch the weather.
+    
+    This function is blocking (LLM and HTTP calls) and is run in a worker thread
+    so the REPL event loop stays free.
+    
+    Args:
+        processed_query: The preprocessed user query
+        location_resolution_chain: Chain that extracts the location as JSON
+        llm: The LLM instance used for geocoding
+        api_key: OpenWeatherMap API key
+        units: Units for temperature (metric, imperial)
+        
+    Returns:
+        Response string for the user
+    """
+    # Initialize response variable
+    response = "I don't understand your query. Please try again."
+    
+    # Extract location using the location resolution chain
+    try:
+        # Get the raw text response from the LLM
+        llm_response = location_resolution_chain.invoke({"query": processed_query})
+        logger.debug("Raw LLM response: %s", llm_response)
+        
+        # Parse the response (JSON first, then text patterns), falling back to the original query
+        location = extract_location_from_text(llm_response)
+        if not location:
+            logger.debug("Extraction from LLM response failed, trying to extract from query...")
+            location = extract_location_from_text(processed_query) or "Unknown"
+        
+        logger.debug("Extracted location: %r", location)
+        
+        if location and location.lower() != "unknown":
+            # First try to geocode using the LLM
+            logger.debug("Using LLM to geocode location: %r", location)
+            coordinates = llm_geocode_location(location, llm)
+            
+            # If LLM geocoding fails, fall back to API
+            if not coordinates:
+                logger.debug("LLM geocoding failed, falling back to API for: %r", location)
+                coordinates = api_geocode_location(location, api_key)
+            
+            if coordinates:
+                lat, lon = coordinates
+                logger.debug("Fetching weather and forecast for coordinates: (%s, %s)", lat, lon)
+                
+                # Current weather and the forecast for the rest of the day are independent,
+                # so fetch them concurrently
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    weather_future = executor.submit(get_weather_by_coordinates, lat, lon, api_key, units)
+                    forecast_future = executor.submit(get_forecast_by_coordinates, lat, lon, api_key, units)
+                    weather_text, raw_weather_data = weather_future.result()
+                    forecast_data, raw_forecast_data = forecast_future.result()
+                logger.debug("Current weather data: %s", weather_text)
+                
+                # Check if we got an error message back for current weather
+                if isinstance(weather_text, str) and "Error" in weather_text:
+                    response = f"I couldn't get the weather for {location}. {weather_text}"
+                else:
+                    # Get clothing recommendations for current weather and forecast
+                    clothing_recommendations = get_clothing_recommendation(raw_weather_data, forecast_data)
+                    
+                    # Use a simple string for the weather response with clothing recommendations
+                    response = f"Based on your query about the weather in {location}, here's what I found:\n\n{weather_text}\n\n{clothing_recommendations}"
+            else:
+                # If we couldn't geocode the specific location, provide a helpful message
+                city_match = _CITY_RE.search(location)
+                if city_match:
+                    city = city_match.group(1)
+                    response = f"I couldn't find the specific location '{location}'. Try asking about the weather in '{city}' instead."
+                else:
+                    response = f"I couldn't find the location '{location}'. Please try a different location."
+        else:
+            response = "I need a location to check the weather. Please specify a city or place."
+    except Exception as e:
+        logger.debug("Error processing location: %s", e)
+        
+        # Try a direct approach if the chain fails
+        try:
+            logger.debug("Trying direct location extraction from query...")
+            location = extract_location_from_text(processed_query)
+            
+            if location and location.lower() != "unknown":
+                # First try to geocode using the LLM
+                logger.debug("Using LLM to geocode location: %r", location)
+                coordinates = llm_geocode_location(location, llm)
+                
+                # If LLM geocoding fails, fall back to API
+                if not coordinates:
+                    logger.debug("LLM geocoding failed, falling back to API for: %r", location)
+                    coordinates = api_geocode_location(location, api_key)
+                
+                if coordinates:
+                    lat, lon = coordinates
+                    logger.debug("Fetching weather for coordinates: (%s, %s)", lat, lon)
+                    
+                    # Get current weather data
+                    weather_text, raw_weather_data = get_weather_by_coordinates(lat, lon, api_key, units)
+                    
+                    # Check if we got an error message back
+                    if isinstance(weather_text, str) and "Error" in weather_text:
+                        response = f"I couldn't get the weather for {location}. {weather_text}"
+                    else:
+                        response = f"Based on your query about the weather in {location}, here's what I found:\n\n{weather_text}"
+                else:
+                    response = f"I couldn't find the location '{location}'. Please try a different location."
+        except Exception as e:
+            logger.warning("Error during direct location extraction: %s", e)
+            response = "I had trouble processing your weather query. Please try again with a clearer location."
+    
+    return response
+
+async def answer_query(user_query, location_resolution_chain, general_query_chain, llm, api_key, units, on_token=None):
+    """
+    Answer a single user query without blocking the event loop.
+    
+    Args:
+        user_query: The raw user query
+        location_resolution_chain: Chain that extracts the location as JSON
+        general_query_chain: Chain used for non-weather queries
+        llm: The LLM instance used for geocoding
+        api_key: OpenWeatherMap API key
+        units: Units for temperature (metric, imperial)
+        on_token: Optional callback receiving general-answer tokens as they are generated
+        
+    Returns:
+        Response string for the user
+    """
+    # Preprocess the user query
+    processed_query = preprocess_query(user_query)
+    
+    # Check if it's a weather query
+    if _WEATHER_INTENT_RE.search(processed_query):
+        logger.debug("Processing weather query...")
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, answer_weather_query, processed_query, location_resolution_chain, llm, api_key, units
+        )
+    
+    # For non-weather queries, reuse a recent answer to the identical query if we have one
+    cache_key = _response_cache_key(getattr(llm, "model", ""), processed_query)
+    cached = _cache_get(_response_cache, cache_key, RESPONSE_CACHE_TTL)
+    if cached is not None:
+        logger.debug("Using cached response")
+        return cached
+    
+    # Otherwise use the general query chain
+    logger.debug("Processing general query...")
+    if on_token is None:
+        response = await general_query_chain.ainvoke({"query": processed_query})
+    else:
+        chunks = []
+        async for chunk in general_query_chain.astream({"query": processed_query}):
+            chunks.append(chunk)
+            on_token(chunk)
+        response = "".join(chunks)
+    _cache_set(_response_cache, cache_key, response)
+    return response
+
+async def answer_queries(queries, location_resolution_chain, general_query_chain, llm, api_key, units):
+    """
+    Answer several queries concurrently, keeping at most OLLAMA_NUM_PARALLEL in flight.
+    
+    Args:
+        queries: List of raw user queries
+        location_resolution_chain: Chain that extracts the location as JSON
+        general_query_chain: Chain used for non-weather queries
+        llm: The LLM instance used for geocoding
+        api_key: OpenWeatherMap API key
+        units: Units for temperature (metric, imperial)
+        
+    Returns:
+        List of response strings in the same order as the queries
+    """
+    max_parallel = max(1, min(len(queries), int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))))
+    semaphore = asyncio.Semaphore(max_parallel)
+    
+    async def answer_one(query):
+        async with semaphore:
+            try:
+                return await answer_query(
+                    query, location_resolution_chain, general_query_chain, llm, api_key, units
+                )
+            except Exception as e:
+                return f"Error processing query: {str(e)}"
+    
+    return await asyncio.gather(*(answer_one(query) for query in queries))
+
+async def warm_up_model(llm):
+    """
+    Ask Ollama to load the model so the first real query doesn't pay the load time.
     
+    Args:
+        llm: The LLM instance to warm up
+    """
     try:
+        # An empty prompt makes Ollama load the model without generating anything
+        await llm.ainvoke("")
+    except Exception as e:
+        logger.debug("Model warm-up failed: %s", e)
+
+async def main():
+    # Discard stdout and stderr to suppress initialization messages
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        # Import LangChain components here rather than at module level, so
+        # importing this module doesn't pay for loading LangChain up front
+        try:
+            # Try to import OllamaLLM from langchain_ollama (recommended)
+            from langchain_ollama import OllamaLLM
+            import httpx
+            # Suppressed: print("Using OllamaLLM from langchain_ollama")
+            
+            # OllamaLLM keeps one httpx client per instance; keep its idle sockets
+            # open between REPL turns instead of httpx's default 5 second expiry
+            llm_kwargs = {
+                "client_kwargs": {
+                    "limits": httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=600)
+                }
+            }
+        except ImportError:
+            # Fall back to deprecated import if langchain_ollama is not installed
+            from langchain_community.llms import Ollama as OllamaLLM
+            # Suppressed: print("Warning: Using deprecated Ollama import...")
+            
+            # The deprecated client opens a new connection per request
+            llm_kwargs = {}
+        
+        # Import project components
+        from src.tools.weather_tool import WeatherTool
+        from src.config import config
+        
         # Initialize Ollama
         ollama_url = config.get("ollama.base_url", "http://localhost:11434")
         ollama_model = config.get("ollama.default_model", "llama3")
+        # Keep the model loaded between turns so a pause doesn't trigger a reload
+        ollama_keep_alive = config.get("ollama.keep_alive", "30m")
         # Suppressed: print(f"Initializing Ollama with model: {ollama_model}")
-        llm = OllamaLLM(base_url=ollama_url, model=ollama_model)
+        llm = OllamaLLM(base_url=ollama_url, model=ollama_model, keep_alive=ollama_keep_alive, **llm_kwargs)
         
         # Initialize weather tool and get API key
         weather_tool = WeatherTool()
@@ -644,248 +958,76 @@ def main():
         units = "metric"  # Default to metric units if not specified
         if hasattr(weather_tool, "units") and isinstance(weather_tool.units, str):
             units = weather_tool.units
-    finally:
-        # Restore stdout and stderr
-        sys.stdout = original_stdout
-        sys.stderr = original_stderr
-    
-    # Create a prompt template for general queries
-    prompt_template = """
-    You are a helpful AI assistant with access to weather information.
-    If the user asks about the weather, use the weather tool to provide accurate information.
-    Otherwise, respond helpfully to their query.
-
-    User query: {query}
-
-    Think step by step:
-    1. Determine if this is a weather-related query
-    2. If it is weather-related, extract the location and use the weather tool
-    3. If not weather-related, respond based on your knowledge
-
-    Your response:
-    """
-
-    # Create a prompt template for location extraction with improved JSON formatting
-    # Note: Double curly braces {{ }} are used to escape actual curly braces in the template
-    weather_location_resolution_prompt = """
-    Your task is to extract ONLY the location from the user query.
-    
-    User query: {query}
-    
-    INSTRUCTIONS:
-    1. Identify the location mentioned in the query
-    2. Return ONLY a valid JSON object with this exact format: {{"location": "EXTRACTED_LOCATION"}}
-    3. Replace EXTRACTED_LOCATION with the actual location from the query
-    4. If no location is found, use: {{"location": "Unknown"}}
-    5. Do not include any explanations, notes, or additional text
-    6. Ensure the JSON is properly formatted with double quotes
-    7. Ignore punctuation like commas, periods, and question marks when extracting the location
-    8. Keep multi-word locations together (e.g., "New York", "London Waterloo")
-    9. For specific locations like stations or neighborhoods, include the city name (e.g., "London Waterloo" or "Waterloo, London")
-    
-    EXAMPLE OUTPUTS:
-    {{"location": "London"}}
-    {{"location": "New York City"}}
-    {{"location": "London Waterloo"}}
-    {{"location": "London, UK"}}
-    {{"location": "Unknown"}}
-    
-    EXAMPLE INPUTS AND EXPECTED OUTPUTS:
-    Input: "What's the weather like in Paris?"
-    Output: {{"location": "Paris"}}
-    
-    Input: "Hey, how is the weather in London Waterloo today?"
-    Output: {{"location": "London Waterloo"}}
-    
-    Input: "Will it rain tomorrow in San Francisco, California?"
-    Output: {{"location": "San Francisco, California"}}
-    
-    YOUR RESPONSE (ONLY JSON):
-    """
-
-    # Create prompt templates
-    location_resolution_prompt = PromptTemplate(
-        template=weather_location_resolution_prompt, 
-        input_variables=["query"]
-    )
-    
-    general_prompt = PromptTemplate(
-        template=prompt_template, 
-        input_variables=["query"]
-    )
-    
-    # Create output parsers
-    location_parser = JsonOutputParser()
-    str_parser = StrOutputParser()
-    
-    # Create the location resolution chain
-    location_resolution_chain = (
-        {"query": RunnablePassthrough()} 
-        | location_resolution_prompt
-        | llm
-        | str_parser  # Use StrOutputParser first to get the raw text
-    )
-    
-    # Create the general query chain
-    general_query_chain = (
-        {"query": RunnablePassthrough()}
-        | general_prompt
-        | llm
-        | str_parser
-    )
-    
-    # Set debug mode (set to False to hide debug prints)
-    DEBUG = False
-    
-    # Define a debug print function that only prints if DEBUG is True
-    def debug_print(*args, **kwargs):
-        if DEBUG:
-            print(*args, **kwargs)
+        
+        # Create the location resolution and general query chains
+        location_resolution_chain, general_query_chain = build_chains(llm)
+    
+    # Piped input is answered as one concurrent batch instead of an interactive session
+    if not sys.stdin.isatty():
+        queries = []
+        for line in sys.stdin:
+            line = line.strip()
+            if line.lower() in ["exit", "quit", "q"]:
+                break
+            if line:
+                queries.append(line)
+        
+        responses = await answer_queries(
+            queries, location_resolution_chain, general_query_chain, llm, api_key, units
+        )
+        for query, response in zip(queries, responses):
+            print(f"\nYour query: {query}")
+            print("\nResponse:", response)
+        return
     
     print("Ollama Weather Agent Example")
     print("Type 'exit' to quit")
     print("-" * 50)
     
-    while True:
-        # Get user input
-        user_query = input("\nYour query: ")
-        
-        if user_query.lower() in ["exit", "quit", "q"]:
-            print("Goodbye!")
-            break
-        
-        try:
-            # Initialize response variable
-            response = "I don't understand your query. Please try again."
+    loop = asyncio.get_event_loop()
+    
+    # Load the model in the background while the user types their first query.
+    # The event loop only keeps a weak reference to tasks, so hold on to it until exit.
+    warm_up_task = asyncio.create_task(warm_up_model(llm))
+    
+    try:
+        while True:
+            # Get user input without blocking the event loop
+            user_query = await loop.run_in_executor(None, input, "\nYour query: ")
             
-            # Preprocess the user query
-            processed_query = preprocess_query(user_query)
+            if user_query.lower() in ["exit", "quit", "q"]:
+                print("Goodbye!")
+                break
             
-            # Check if it's a weather query
-            if "weather" in processed_query.lower():
-                debug_print("Processing weather query...")
+            try:
+                streamed = []
                 
-                # Extract location using the location resolution chain
-                try:
-                    # Get the raw text response from the LLM
-                    llm_response = location_resolution_chain.invoke(processed_query)
-                    debug_print(f"Raw LLM response: {llm_response}")
-                    
-                    # Try to parse the JSON response
-                    location = None
-                    try:
-                        # Try to clean up the response if it contains extra text
-                        json_match = re.search(r'\{.*\}', llm_response, re.DOTALL)
-                        if json_match:
-                            json_str = json_match.group(0)
-                            location_data = json.loads(json_str)
-                            location = location_data.get("location", "Unknown")
-                        else:
-                            # If no JSON found, try to parse the whole response
-                            location_data = json.loads(llm_response)
-                            location = location_data.get("location", "Unknown")
-                    except json.JSONDecodeError:
-                        # Fallback to manual extraction if JSON parsing fails
-                        debug_print("JSON parsing failed, trying manual extraction...")
-                        location = extract_location_from_text(llm_response)
-                        
-                        # If manual extraction fails, try to extract from the original query
-                        if not location:
-                            debug_print("Manual extraction from LLM response failed, trying to extract from query...")
-                            location = extract_location_from_text(processed_query)
-                            
-                        if not location:
-                            location = "Unknown"
-                    
-                    debug_print(f"Extracted location: '{location}'")
-                    
-                    if location and location.lower() != "unknown":
-                        # First try to geocode using the LLM
-                        debug_print(f"Using LLM to geocode location: '{location}'")
-                        coordinates = llm_geocode_location(location, llm)
-                        
-                        # If LLM geocoding fails, fall back to API
-                        if not coordinates:
-                            debug_print(f"LLM geocoding failed, falling back to API for: '{location}'")
-                            coordinates = api_geocode_location(location, api_key)
-                        
-                        if coordinates:
-                            lat, lon = coordinates
-                            debug_print(f"Fetching weather for coordinates: ({lat}, {lon})")
-                            
-                            # Get current weather data
-                            weather_text, raw_weather_data = get_weather_by_coordinates(lat, lon, api_key, units)
-                            debug_print(f"Current weather data: {weather_text}")
-                            
-                            # Get forecast data for the rest of the day
-                            debug_print(f"Fetching forecast for the rest of the day...")
-                            forecast_data, raw_forecast_data = get_forecast_by_coordinates(lat, lon, api_key, units)
-                            
-                            # Check if we got an error message back for current weather
-                            if isinstance(weather_text, str) and "Error" in weather_text:
-                                response = f"I couldn't get the weather for {location}. {weather_text}"
-                            else:
-                                # Get clothing recommendations for current weather and forecast
-                                clothing_recommendations = get_clothing_recommendation(raw_weather_data, forecast_data)
-                                
-                                # Use a simple string for the weather response with clothing recommendations
-                                response = f"Based on your query about the weather in {location}, here's what I found:\n\n{weather_text}\n\n{clothing_recommendations}"
-                        else:
-                            # If we couldn't geocode the specific location, provide a helpful message
-                            city_match = re.search(r'([A-Za-z]+)', location)
-                            if city_match:
-                                city = city_match.group(1)
-                                response = f"I couldn't find the specific location '{location}'. Try asking about the weather in '{city}' instead."
-                            else:
-                                response = f"I couldn't find the location '{location}'. Please try a different location."
-                    else:
-                        response = "I need a location to check the weather. Please specify a city or place."
-                except Exception as e:
-                    debug_print(f"Error processing location: {str(e)}")
-                    
-                    # Try a direct approach if the chain fails
-                    try:
-                        debug_print("Trying direct location extraction from query...")
-                        location = extract_location_from_text(processed_query)
-                        
-                        if location and location.lower() != "unknown":
-                            # First try to geocode using the LLM
-                            debug_print(f"Using LLM to geocode location: '{location}'")
-                            coordinates = llm_geocode_location(location, llm)
-                            
-                            # If LLM geocoding fails, fall back to API
-                            if not coordinates:
-                                debug_print(f"LLM geocoding failed, falling back to API for: '{location}'")
-                                coordinates = api_geocode_location(location, api_key)
-                            
-                            if coordinates:
-                                lat, lon = coordinates
-                                debug_print(f"Fetching weather for coordinates: ({lat}, {lon})")
-                                
-                                # Get current weather data
-                                weather_text, raw_weather_data = get_weather_by_coordinates(lat, lon, api_key, units)
-                                
-                                # Check if we got an error message back
-                                if isinstance(weather_text, str) and "Error" in weather_text:
-                                    response = f"I couldn't get the weather for {location}. {weather_text}"
-                                else:
-                                    response = f"Based on your query about the weather in {location}, here's what I found:\n\n{weather_text}"
-                            else:
-                                response = f"I couldn't find the location '{location}'. Please try a different location."
-                    except Exception as e:
-                        print(f"Error during direct location extraction: {str(e)}")
-                        response = "I had trouble processing your weather query. Please try again with a clearer location."
-            else:
-                # For non-weather queries, use the general query chain
-                print("Processing general query...")
-                response = general_query_chain.invoke(processed_query)
+                def write_token(token):
+                    # Print tokens as they arrive instead of waiting for the full answer
+                    if not streamed:
+                        sys.stdout.write("\nResponse: ")
+                    streamed.append(token)
+                    sys.stdout.write(token)
+                    sys.stdout.flush()
                 
-            # Print the response
-            print("\nResponse:", response)
-        except Exception as e:
-            print(f"\nError processing query: {str(e)}")
-            print("Please try again with a different query.")
+                response = await answer_query(
+                    user_query, location_resolution_chain, general_query_chain, llm, api_key, units,
+                    on_token=write_token
+                )
+                
+                # Print the response unless it was already streamed
+                if streamed:
+                    print()
+                else:
+                    print("\nResponse:", response)
+            except Exception as e:
+                print(f"\nError processing query: {str(e)}")
+                print("Please try again with a different query.")
+    finally:
+        # Stop a warm-up that is still loading the model, and wait for it so it is never left pending
+        warm_up_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warm_up_task
 
 if __name__ == "__main__":
-    main()
-
+    asyncio.run(main())
@@ -2,7 +2,6 @@
 """
 Entry point script to run the Ollama Weather Agent API server.
 """
-import uvicorn
 import os
 from src.config import config
 
@@ -12,12 +11,24 @@ if __name__ == "__main__":
     port = config.get("api.port", 8000)
     debug = config.get("api.debug", True)
     
+    # reload and multiple workers are mutually exclusive: debug runs a single
+    # reloading process, otherwise one worker per CPU (or WEB_CONCURRENCY)
+    if debug:
+        workers = 1
+    else:
+        workers = int(os.getenv("WEB_CONCURRENCY", max(2, os.cpu_count() or 2)))
+    
     print(f"Starting Ollama Weather Agent API on {host}:{port}...")
     print(f"Using Ollama model: {config.get('ollama.default_model', 'llama3')}")
     print(f"Debug mode: {'enabled' if debug else 'disabled'}")
+    print(f"Workers: {workers}")
     print("Press Ctrl+C to stop the server")
     
-    # Run the FastAPI application
-    uvicorn.run("src.app:app", host=host, port=port, reload=debug)
+    import uvicorn
+    
+    # Run the FastAPI application. uvicorn[standard] installs uvloop and httptools;
+    # "auto" uses them when available and falls back to asyncio/h11 otherwise
+    # (uvloop is not available on Windows).
+    uvicorn.run("src.app:app", host=host, port=port, reload=debug, workers=workers, loop="auto", http="auto")
 
 
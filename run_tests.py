@@ -4,11 +4,11 @@ Script to run all tests for the Ollama Weather Agent.
 """
 import os
 import sys
-import unittest
-import pytest
 
 def run_tests():
-    """Run all tests using unittest and pytest."""
+    """Run all tests with pytest, which also collects the unittest-style test cases."""
+    import pytest
+    
     print("Running tests for Ollama Weather Agent...")
     
     # Get the directory containing this script
@@ -17,16 +17,12 @@ def run_tests():
     # Add the project root to the Python path
     sys.path.insert(0, base_dir)
     
-    # Run unittest tests
-    print("\n=== Running unittest tests ===")
-    test_loader = unittest.TestLoader()
-    test_suite = test_loader.discover(os.path.join(base_dir, "tests"))
-    test_runner = unittest.TextTestRunner(verbosity=2)
-    test_result = test_runner.run(test_suite)
-    
-    # Run pytest tests with coverage
+    # Run pytest tests with coverage, in parallel across all cores; loadfile keeps
+    # each module's tests (and the module-level app state they patch) on one worker
     print("\n=== Running pytest with coverage ===")
     pytest_args = [
+        "-n", "auto",
+        "--dist=loadfile",
         "--cov=src",
         "--cov-report=term",
         "--cov-report=html:coverage_report",
@@ -34,8 +30,7 @@ def run_tests():
     ]
     pytest_result = pytest.main(pytest_args)
     
-    # Return success if both test runners succeeded
-    return test_result.wasSuccessful() and pytest_result == 0
+    return pytest_result == 0
 
 if __name__ == "__main__":
     success = run_tests()
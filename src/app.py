@@ -1,33 +1,99 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-import uvicorn
 import os
-import json
+import asyncio
 import re
+import time
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import anyio
 import requests
-import urllib.parse
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import logging
 import warnings
 from datetime import datetime, timedelta
-from langchain.chains import LLMChain
-from langchain_community.llms import Ollama
-from langchain.prompts import PromptTemplate
 
 from src.tools.weather_tool import WeatherTool
 from src.config import config
+from src import http_client
+from src.llm_json import parse_llm_json
+from src.clothing import recommendations_for, weather_condition
 
-app = FastAPI(title="Ollama Weather Agent")
+# Per-request tracing is logged at DEBUG, so its messages are only formatted when enabled
+logger = logging.getLogger(__name__)
+
+# Prefer orjson for parsing LLM output and OpenWeatherMap responses and for encoding
+# streamed lines, falling back to the standard library. Both libraries accept bytes,
+# and their decode errors subclass ValueError.
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+    _loads = json.loads
+    
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+# Blocking LLM and weather calls run in anyio's threadpool (40 threads by default);
+# raise the limit so concurrent requests don't queue behind each other
+THREADPOOL_SIZE = 100
+
+def configure_logging():
+    """
+    Show this app's log records at the configured level: DEBUG when api.debug is on,
+    otherwise logging.level. Other libraries stay at WARNING.
+    """
+    level = "DEBUG" if config.get("api.debug", False) else config.get("logging.level", "INFO")
+    logging.basicConfig(format=config.get("logging.format", logging.BASIC_FORMAT))
+    logging.getLogger("src").setLevel(level)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Runs in every server process: uvicorn's reload and worker processes import the app
+    # afresh, so logging set up by run.py would not reach them
+    configure_logging()
+    
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    
+    # Build the LLM clients in the background so the worker starts serving at once
+    # and the first request usually finds them ready
+    warm_up_task = asyncio.ensure_future(run_in_threadpool(warm_up))
+    yield
+    warm_up_task.cancel()
+
+app = FastAPI(title="Ollama Weather Agent", lifespan=lifespan)
+
+# Weather answers are compressible prose; small replies and errors are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
 
 # Initialize Ollama
 ollama_url = config.get("ollama.base_url", "http://localhost:11434")
 ollama_model = config.get("ollama.default_model", "llama3")
-llm = Ollama(base_url=ollama_url, model=ollama_model)
+ollama_keep_alive = config.get("ollama.keep_alive", "30m")
+
+# LangChain (langchain_community in particular) takes seconds to import, so the LLM,
+# chains and weather tool are created on first use rather than when a worker starts.
+# The lock keeps the startup warm-up and an early request from building them twice.
+llm = None
+general_chain = None
+location_resolution_chain = None
+weather_tool = None
+_singleton_lock = threading.RLock()
 
-# Initialize tools
-weather_tool = WeatherTool()
-api_key = weather_tool.api_key
-units = "metric"  # Default to metric units if not specified
-if hasattr(weather_tool, "units") and isinstance(weather_tool.units, str):
-    units = weather_tool.units
+@lru_cache(maxsize=1)
+def _langchain():
+    """Import the LangChain classes used by the agent."""
+    from langchain.chains import LLMChain
+    from langchain_community.llms import Ollama
+    from langchain.prompts import PromptTemplate
+    return LLMChain, Ollama, PromptTemplate
 
 # Create a prompt template
 prompt_template = """
@@ -45,6 +111,22 @@ Think step by step:
 Your response:
 """
 
+# Prompt for LLM geocoding, formatted with the location on each call
+GEOCODING_PROMPT = """
+You are a helpful assistant that provides accurate latitude and longitude coordinates for locations.
+
+Location: {location}
+
+Please provide the latitude and longitude coordinates for this location in the following JSON format:
+{{"latitude": LATITUDE_VALUE, "longitude": LONGITUDE_VALUE}}
+
+Replace LATITUDE_VALUE and LONGITUDE_VALUE with the actual numerical coordinates.
+Use decimal degrees with 6 decimal places of precision.
+Do not include any explanations or additional text, only return the JSON object.
+
+If you're not sure about the exact coordinates, provide your best estimate.
+"""
+
 weather_location_resolution_prompt = """
 Your task is to extract ONLY the location from the user query.
 
@@ -60,6 +142,7 @@ INSTRUCTIONS:
 7. Ignore punctuation like commas, periods, and question marks when extracting the location
 8. Keep multi-word locations together (e.g., "New York", "London Waterloo")
 9. For specific locations like stations or neighborhoods, include the city name (e.g., "London Waterloo" or "Waterloo, London")
+10. If the query mentions several locations, join them with " and " (e.g., "Paris and Berlin")
 
 EXAMPLE OUTPUTS:
 {{"location": "London"}}
@@ -71,8 +154,156 @@ EXAMPLE OUTPUTS:
 YOUR RESPONSE (ONLY JSON):
 """
 
-prompt = PromptTemplate(template=prompt_template, input_variables=["query"])
-location_resolution_prompt = PromptTemplate(template=weather_location_resolution_prompt, input_variables=["query"])
+def get_llm():
+    """Return the shared Ollama LLM, creating it on first use."""
+    global llm
+    if llm is None:
+        with _singleton_lock:
+            if llm is None:
+                _, Ollama, _ = _langchain()
+                llm = Ollama(base_url=ollama_url, model=ollama_model, keep_alive=ollama_keep_alive)
+    return llm
+
+def get_general_chain():
+    """Return the chain for general queries, building it once on first use."""
+    global general_chain
+    if general_chain is None:
+        with _singleton_lock:
+            if general_chain is None:
+                LLMChain, _, PromptTemplate = _langchain()
+                prompt = PromptTemplate(template=prompt_template, input_variables=["query"])
+                general_chain = LLMChain(llm=get_llm(), prompt=prompt)
+    return general_chain
+
+def get_location_resolution_chain():
+    """Return the chain that extracts locations from weather queries, building it once on first use."""
+    global location_resolution_chain
+    if location_resolution_chain is None:
+        with _singleton_lock:
+            if location_resolution_chain is None:
+                LLMChain, _, PromptTemplate = _langchain()
+                prompt = PromptTemplate(template=weather_location_resolution_prompt, input_variables=["query"])
+                location_resolution_chain = LLMChain(llm=get_llm(), prompt=prompt)
+    return location_resolution_chain
+
+def get_weather_tool():
+    """Return the shared weather tool, which holds the OpenWeatherMap key and units."""
+    global weather_tool
+    if weather_tool is None:
+        with _singleton_lock:
+            if weather_tool is None:
+                weather_tool = WeatherTool()
+    return weather_tool
+
+def get_units():
+    """Return the configured units, defaulting to metric."""
+    units = getattr(get_weather_tool(), "units", None)
+    return units if isinstance(units, str) else "metric"
+
+def warm_up():
+    """Create the weather tool, LLM and chains ahead of the first request."""
+    try:
+        get_weather_tool()
+        get_general_chain()
+        get_location_resolution_chain()
+    except Exception as e:
+        logger.warning("Warm-up failed, clients will be created on first use: %s", e)
+
+_ready_getters = set()
+
+async def get_client(getter):
+    """
+    Call one of the getters above from async code. Until its client exists a getter
+    imports LangChain and may wait for the warm-up on _singleton_lock, so that first
+    call runs in the threadpool instead of blocking the event loop.
+    """
+    if getter in _ready_getters:
+        return getter()
+    client = await run_in_threadpool(getter)
+    _ready_getters.add(getter)
+    return client
+
+# Routes queries to the weather branch with one precompiled scan of the query
+WEATHER_INTENT_RE = re.compile(r"\b(?:weather|forecast|temperature|rain|snow)\b", re.IGNORECASE)
+
+# Text patterns used on every weather query, compiled once at import
+WHITESPACE_RE = re.compile(r'\s+')
+LOCATION_KEY_RE = re.compile(r'location["\s:]+([^"}\s]+|"[^"]+")(?:\s*})?', re.IGNORECASE)
+WEATHER_IN_RE = re.compile(r'weather\s+(?:in|for|at|of)\s+([A-Za-z\s,]+)(?:\s|$|\.|\?)', re.IGNORECASE)
+COORDINATES_RE = re.compile(r'(-?\d+\.?\d*)[,\s]+(-?\d+\.?\d*)')
+NON_WORD_RE = re.compile(r'[^\w\s]')
+CITY_RE = re.compile(r'[A-Za-z]+')
+
+# Simple "weather in <place>" queries are answered without asking the LLM for the location.
+# The place may be up to three words with an optional ", Country", followed only by an
+# optional time of day and punctuation, and must be known to the geocoding API by exactly
+# that name; anything else goes to the LLM.
+WEATHER_LOCATION_FAST_RE = re.compile(
+    r"\bweather\s+(?:in|for|at|of)\s+"
+    r"([A-Za-z]+(?:[ -][A-Za-z]+){0,2}?(?:, ?[A-Za-z]+(?: [A-Za-z]+)??)??)"
+    r"(?:\s+(?:today|tonight|tomorrow|now|right now|this (?:morning|afternoon|evening|week)))?"
+    r"\s*[?.!]?$",
+    re.IGNORECASE
+)
+# Captures containing any of these words are deictic or about time ("weather for today",
+# "weather at home"), not places, so they go to the LLM without a geocoding lookup
+NOT_A_PLACE_WORDS = frozenset({
+    "my", "your", "our", "the", "here", "there", "this", "that", "it", "and", "or", "like",
+    "today", "tonight", "tomorrow", "yesterday", "now", "later", "soon", "currently", "next",
+    "week", "weekend", "day", "days", "morning", "afternoon", "evening", "night", "hour", "hours",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "general", "outside", "everywhere", "forecast", "weather", "me", "us", "you",
+    "home", "work", "school", "office",
+})
+LOCATION_SEPARATOR_RE = re.compile(r'\s+(?:and|&)\s+|\s*;\s*', re.IGNORECASE)
+
+# First words that make a query a question
+QUESTION_WORDS = frozenset({"how", "what", "when", "where", "why", "is", "can", "will", "should"})
+
+# Upper bound on concurrent lookups for one multi-location query, to respect API rate limits
+MAX_CONCURRENT_LOCATIONS = 8
+
+# Location extraction and geocoding are deterministic enough to reuse: successful
+# results are cached in-process as key -> (stored_at, value)
+LOCATION_CACHE_TTL = 86400  # seconds
+GEOCODE_CACHE_TTL = 86400  # seconds
+CACHE_MAX_ENTRIES = 4096
+_location_cache = {}  # llm_cache_key(prompt for the lowercased query) -> location
+_geocode_cache = {}  # lowercased location -> (lat, lon)
+_api_geocode_cache = {}  # lowercased location variation -> (lat, lon) from the geocoding API
+
+# When the full location name has no result, its broader variations are geocoded concurrently.
+# The executor is shared by all requests, so it is sized for several lookups at once.
+_geocode_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="geocode")
+
+# Complete /chat answers are reused for as long as the weather they describe is considered fresh
+RESPONSE_CACHE_TTL = config.get("weather.cache_duration", 1800)  # seconds
+_response_cache = {}  # (model, units, lowercased query) -> response
+
+def llm_cache_key(prompt_text):
+    """
+    Key an LLM answer by model and exact prompt, so that editing a prompt or switching
+    models never serves stale answers. The key is a plain string, ready for an
+    external store such as Redis.
+    """
+    return hashlib.sha256(_dumps({"model": ollama_model, "prompt": prompt_text})).hexdigest()
+
+def cache_get(cache, key, ttl):
+    """
+    Return a cached value if it is younger than ttl seconds, otherwise None.
+    """
+    entry = cache.get(key)
+    if entry and time.monotonic() - entry[0] < ttl:
+        return entry[1]
+    return None
+
+def cache_set(cache, key, value):
+    """
+    Store a value in a cache, evicting the oldest entry when the cache is full.
+    """
+    if key not in cache and len(cache) >= CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+    cache[key] = (time.monotonic(), value)
 
 def preprocess_query(query):
     """
@@ -81,243 +312,362 @@ def preprocess_query(query):
     # Remove any leading/trailing whitespace
     query = query.strip()
     
-    # Replace multiple spaces with a single space
-    query = re.sub(r'\s+', ' ', query)
+    # Replace multiple spaces with a single space. Any whitespace other than a
+    # single space is either doubled or non-printable, so clean input skips the regex
+    if "  " in query or not query.isprintable():
+        query = WHITESPACE_RE.sub(' ', query)
     
     # Ensure the query ends with a question mark if it's a question
-    if any(query.lower().startswith(q) for q in ["how", "what", "when", "where", "why", "is", "can", "will", "should"]) and not query.endswith("?"):
+    # (the first word decides, with contractions such as "what's" reduced to "what")
+    first_word = query.split(' ', 1)[0].split("'", 1)[0].lower()
+    if first_word in QUESTION_WORDS and not query.endswith("?"):
         query = query + "?"
     
     return query
 
 def extract_location_from_text(text):
     """
-    Manually extract location from text in case JSON parsing fails.
-    Attempts to find JSON structure or extract location using regex patterns.
+    Extract a location from text, preferring a JSON object and falling back to regex patterns.
+    
+    Returns:
+        Tuple of (location or None, was_json). was_json is True when the text held a
+        valid JSON object, whose answer is final even if it has no location.
     """
     # Try to parse as JSON first
-    try:
-        # Find JSON-like structure in the text
-        json_match = re.search(r'\{.*\}', text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            data = json.loads(json_str)
-            if "location" in data:
-                return data["location"]
-    except Exception as e:
-        print(f"JSON extraction failed: {str(e)}")
+    data = parse_llm_json(text)
+    if data is not None:
+        return data.get("location"), True
     
     # Fallback: Try to extract location using regex patterns
-    try:
-        # Look for patterns like 'location: "New York"' or 'location: New York'
-        location_match = re.search(r'location["\s:]+([^"}\s]+|"[^"]+")(?:\s*})?', text, re.IGNORECASE)
-        if location_match:
-            location = location_match.group(1).strip('"')
-            return location
-    except Exception:
-        pass
+    # Look for patterns like 'location: "New York"' or 'location: New York'
+    location_match = LOCATION_KEY_RE.search(text)
+    if location_match:
+        return location_match.group(1).strip('"'), False
     
     # Try to extract location from common weather query patterns
-    try:
-        # Look for patterns like "weather in [location]" or "weather for [location]"
-        weather_match = re.search(r'weather\s+(?:in|for|at|of)\s+([A-Za-z\s,]+)(?:\s|$|\.|\?)', text, re.IGNORECASE)
-        if weather_match:
-            return weather_match.group(1).strip()
-    except Exception:
-        pass
+    # Look for patterns like "weather in [location]" or "weather for [location]"
+    weather_match = WEATHER_IN_RE.search(text)
+    if weather_match:
+        return weather_match.group(1).strip(), False
     
-    # If all else fails, try to extract any city name from the text
-    return None
+    return None, False
+
+def match_weather_location(user_query):
+    """
+    Return the candidate place of a simple "weather in <place>" query, or None if the LLM is needed.
+    """
+    match = WEATHER_LOCATION_FAST_RE.search(user_query)
+    if not match:
+        return None
+    
+    location = match.group(1)
+    if NOT_A_PLACE_WORDS.intersection(CITY_RE.findall(location.lower())):
+        return None
+    return location
+
+async def fast_path_location(user_query):
+    """
+    Return the place of a simple "weather in <place>" query if the geocoding API knows it by
+    exactly that name, so "weather in Paris in July" or "weather for running" still go to the LLM.
+    """
+    location = match_weather_location(user_query)
+    if not location:
+        return None
+    
+    api_key = (await get_client(get_weather_tool)).api_key
+    if not api_key or not await run_in_threadpool(geocode_exact, location, api_key):
+        return None
+    return location
+
+async def resolve_location(user_query):
+    """
+    Ask the LLM for the location in a weather query, falling back to text extraction.
+    """
+    # Get the raw text response from the LLM without blocking the event loop
+    chain = await get_client(get_location_resolution_chain)
+    llm_response = await chain.arun(query=user_query)
+    logger.debug("Raw LLM response: %s", llm_response)
+    
+    # Parse the JSON answer, falling back to regex extraction if there is none
+    location, was_json = extract_location_from_text(llm_response)
+    
+    # If the LLM gave no usable answer, try to extract from the original query
+    if not location and not was_json:
+        logger.debug("Extraction from LLM response failed, trying to extract from query...")
+        location, _ = extract_location_from_text(user_query)
+    
+    return location or "Unknown"
 
 class Query(BaseModel):
     text: str
 
-@app.post("/chat")
+class ChatResponse(BaseModel):
+    response: str
+
+async def weather_for_location(location):
+    """
+    Geocode a single location and describe its weather with clothing recommendations.
+    
+    Returns:
+        Tuple of (response, cacheable), where cacheable is False for errors and
+        locations that could not be found
+    """
+    cacheable = False
+    tool = await get_client(get_weather_tool)
+    
+    geocode_cache_key = location.strip().lower()
+    coordinates = cache_get(_geocode_cache, geocode_cache_key, GEOCODE_CACHE_TTL)
+    if coordinates:
+        logger.debug("Using cached coordinates for '%s'", location)
+    else:
+        # First try the geocoding API, which is much faster than an LLM round-trip
+        logger.debug("Using API to geocode location: '%s'", location)
+        coordinates = await run_in_threadpool(api_geocode_location, location, tool.api_key)
+        
+        # Only ask the LLM when the API has no result for the location
+        if not coordinates:
+            logger.debug("API geocoding failed, falling back to LLM for: '%s'", location)
+            coordinates = await llm_geocode_location(location)
+        
+        if coordinates:
+            cache_set(_geocode_cache, geocode_cache_key, coordinates)
+    
+    if coordinates:
+        lat, lon = coordinates
+        api_key = tool.api_key
+        units = get_units()
+        logger.debug("Fetching weather for coordinates: (%s, %s)", lat, lon)
+        
+        # Get current weather data and the forecast for the rest of the day concurrently
+        (weather_text, raw_weather_data), (forecast_data, raw_forecast_data) = await asyncio.gather(
+            run_in_threadpool(get_weather_by_coordinates, lat, lon, api_key, units),
+            run_in_threadpool(get_forecast_by_coordinates, lat, lon, api_key, units)
+        )
+        
+        # Check if we got an error message back for current weather
+        if isinstance(weather_text, str) and "Error" in weather_text:
+            response = f"I couldn't get the weather for {location}. {weather_text}"
+        else:
+            # Get clothing recommendations for current weather and forecast
+            clothing_recommendations = get_clothing_recommendation(raw_weather_data, forecast_data)
+            
+            # Use a simple string for the weather response with clothing recommendations
+            response = f"Based on your query about the weather in {location}, here's what I found:\n\n{weather_text}\n\n{clothing_recommendations}"
+            cacheable = True
+    else:
+        # If we couldn't geocode the specific location, provide a helpful message
+        city_match = CITY_RE.search(location)
+        if city_match:
+            city = city_match.group()
+            response = f"I couldn't find the specific location '{location}'. Try asking about the weather in '{city}' instead."
+        else:
+            response = f"I couldn't find the location '{location}'. Please try a different location."
+    
+    return response, cacheable
+
+async def answer_weather_query(user_query):
+    """
+    Resolve the location in a weather query and describe its weather.
+    
+    Returns:
+        Tuple of (response, cacheable), where cacheable is False for errors and
+        requests for a clearer location
+    """
+    # Only complete answers are cached, never errors or requests for a better location
+    cacheable = False
+    
+    # Extract location using the location resolution chain
+    try:
+        # Resolve the location, skipping the LLM for simple queries and reusing
+        # its answer for a query we have already seen
+        location = await fast_path_location(user_query)
+        if location:
+            logger.debug("Matched location without the LLM")
+        else:
+            location_cache_key = llm_cache_key(weather_location_resolution_prompt.format(query=user_query.lower()))
+            location = cache_get(_location_cache, location_cache_key, LOCATION_CACHE_TTL)
+            if location:
+                logger.debug("Using cached location")
+            else:
+                location = await resolve_location(user_query)
+                if location and location.lower() != "unknown":
+                    cache_set(_location_cache, location_cache_key, location)
+        
+        logger.debug("Extracted location: '%s'", location)
+        
+        if location and location.lower() != "unknown":
+            # Several locations ("Paris and Berlin") are looked up concurrently, a few at a time
+            tool = await get_client(get_weather_tool)
+            locations = await run_in_threadpool(split_locations, location, tool.api_key)
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_LOCATIONS)
+            
+            async def bounded_weather_for_location(single_location):
+                async with semaphore:
+                    return await weather_for_location(single_location)
+            
+            results = await asyncio.gather(
+                *(bounded_weather_for_location(single_location) for single_location in locations)
+            )
+            response = "\n\n".join(result for result, _ in results)
+            cacheable = all(result_cacheable for _, result_cacheable in results)
+        else:
+            response = "I need a location to check the weather. Please specify a city or place."
+    except Exception as e:
+        logger.error("Error processing location: %s", e)
+        response = "I had trouble processing your weather query. Please try again with a clearer location."
+    
+    return response, cacheable
+
+async def response_cache_key(user_query):
+    """Build the /chat response cache key for a preprocessed query."""
+    await get_client(get_weather_tool)
+    return (ollama_model, get_units(), user_query.lower())
+
+# Declaring the response model lets FastAPI serialize the reply straight to JSON bytes
+# with Pydantic instead of going through jsonable_encoder and the stdlib json encoder
+@app.post("/chat", response_model=ChatResponse)
 async def chat(query: Query):
+    # LLM calls are awaited natively; the blocking OpenWeatherMap calls run in the
+    # threadpool, so the event loop stays free for other requests
     try:
         user_query = preprocess_query(query.text)
         
+        # Answer repeated queries from the cache without touching the LLM or weather APIs
+        cache_key = await response_cache_key(user_query)
+        response = cache_get(_response_cache, cache_key, RESPONSE_CACHE_TTL)
+        if response is not None:
+            logger.debug("Using cached response")
+            return {"response": response}
+        
         # Check if it's a weather query
-        if "weather" in user_query.lower():
-            print("Processing weather query...")
-            
-            # Extract location using the location resolution chain
-            try:
-                # Get the raw text response from the LLM
-                location_resolution_chain = LLMChain(llm=llm, prompt=location_resolution_prompt)
-                llm_response = location_resolution_chain.run(query=user_query)
-                print(f"Raw LLM response: {llm_response}")
-                
-                # Try to parse the JSON response
-                location = None
-                try:
-                    # Try to clean up the response if it contains extra text
-                    json_match = re.search(r'\{.*\}', llm_response, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group(0)
-                        location_data = json.loads(json_str)
-                        location = location_data.get("location", "Unknown")
-                    else:
-                        # If no JSON found, try to parse the whole response
-                        location_data = json.loads(llm_response)
-                        location = location_data.get("location", "Unknown")
-                except json.JSONDecodeError:
-                    # Fallback to manual extraction if JSON parsing fails
-                    print("JSON parsing failed, trying manual extraction...")
-                    location = extract_location_from_text(llm_response)
-                    
-                    # If manual extraction fails, try to extract from the original query
-                    if not location:
-                        print("Manual extraction from LLM response failed, trying to extract from query...")
-                        location = extract_location_from_text(user_query)
-                        
-                    if not location:
-                        location = "Unknown"
-                
-                print(f"Extracted location: '{location}'")
-                
-                if location and location.lower() != "unknown":
-                    # First try to geocode using the LLM
-                    print(f"Using LLM to geocode location: '{location}'")
-                    coordinates = llm_geocode_location(location)
-                    
-                    # If LLM geocoding fails, fall back to API
-                    if not coordinates:
-                        print(f"LLM geocoding failed, falling back to API for: '{location}'")
-                        coordinates = api_geocode_location(location, api_key)
-                    
-                    if coordinates:
-                        lat, lon = coordinates
-                        print(f"Fetching weather for coordinates: ({lat}, {lon})")
-                        
-                        # Get current weather data
-                        weather_text, raw_weather_data = get_weather_by_coordinates(lat, lon, api_key, units)
-                        
-                        # Get forecast data for the rest of the day
-                        forecast_data, raw_forecast_data = get_forecast_by_coordinates(lat, lon, api_key, units)
-                        
-                        # Check if we got an error message back for current weather
-                        if isinstance(weather_text, str) and "Error" in weather_text:
-                            response = f"I couldn't get the weather for {location}. {weather_text}"
-                        else:
-                            # Get clothing recommendations for current weather and forecast
-                            clothing_recommendations = get_clothing_recommendation(raw_weather_data, forecast_data)
-                            
-                            # Use a simple string for the weather response with clothing recommendations
-                            response = f"Based on your query about the weather in {location}, here's what I found:\n\n{weather_text}\n\n{clothing_recommendations}"
-                    else:
-                        # If we couldn't geocode the specific location, provide a helpful message
-                        city_match = re.search(r'([A-Za-z]+)', location)
-                        if city_match:
-                            city = city_match.group(1)
-                            response = f"I couldn't find the specific location '{location}'. Try asking about the weather in '{city}' instead."
-                        else:
-                            response = f"I couldn't find the location '{location}'. Please try a different location."
-                else:
-                    response = "I need a location to check the weather. Please specify a city or place."
-            except Exception as e:
-                print(f"Error processing location: {str(e)}")
-                response = "I had trouble processing your weather query. Please try again with a clearer location."
+        if WEATHER_INTENT_RE.search(user_query):
+            logger.debug("Processing weather query...")
+            response, cacheable = await answer_weather_query(user_query)
         else:
             # For non-weather queries, use the standard prompt
-            print("Processing general query...")
-            chain = LLMChain(llm=llm, prompt=prompt)
-            response = chain.run(query=user_query)
-            
+            logger.debug("Processing general query...")
+            chain = await get_client(get_general_chain)
+            response = await chain.arun(query=user_query)
+            cacheable = True
+        
+        if cacheable:
+            cache_set(_response_cache, cache_key, response)
         return {"response": response}
     except Exception as e:
-        print(f"Error processing query: {str(e)}")
+        logger.error("Error processing query: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-def llm_geocode_location(location):
+@app.post("/chat/stream")
+async def chat_stream(query: Query):
+    """
+    Answer a query as newline-delimited JSON so clients can show the reply as it is generated.
+    
+    Each line is {"delta": text}; concatenating the deltas gives the same answer as /chat.
+    General answers are streamed token by token, weather answers arrive in one piece.
+    An error part-way through is reported as a final {"error": message} line.
+    """
+    user_query = preprocess_query(query.text)
+    
+    async def generate():
+        try:
+            cache_key = await response_cache_key(user_query)
+            response = cache_get(_response_cache, cache_key, RESPONSE_CACHE_TTL)
+            if response is not None:
+                logger.debug("Using cached response")
+                yield _dumps({"delta": response}) + b"\n"
+                return
+            
+            if WEATHER_INTENT_RE.search(user_query):
+                logger.debug("Processing weather query...")
+                response, cacheable = await answer_weather_query(user_query)
+                yield _dumps({"delta": response}) + b"\n"
+            else:
+                logger.debug("Processing general query...")
+                chunks = []
+                llm_client = await get_client(get_llm)
+                async for chunk in llm_client.astream(prompt_template.format(query=user_query)):
+                    chunks.append(chunk)
+                    yield _dumps({"delta": chunk}) + b"\n"
+                response = "".join(chunks)
+                cacheable = True
+            
+            if cacheable:
+                cache_set(_response_cache, cache_key, response)
+        except Exception as e:
+            logger.error("Error processing query: %s", e)
+            yield _dumps({"error": str(e)}) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+async def llm_geocode_location(location):
     """
     Use the LLM to get latitude and longitude coordinates for a location.
     """
     if not location:
-        print("Error: No location provided for geocoding")
+        logger.warning("No location provided for geocoding")
         return None
     
     try:
-        # Create a prompt for geocoding
-        geocoding_prompt = f"""
-        You are a helpful assistant that provides accurate latitude and longitude coordinates for locations.
-        
-        Location: {location}
+        geocoding_prompt = GEOCODING_PROMPT.format(location=location)
         
-        Please provide the latitude and longitude coordinates for this location in the following JSON format:
-        {{"latitude": LATITUDE_VALUE, "longitude": LONGITUDE_VALUE}}
+        logger.debug("Asking LLM for coordinates of '%s'...", location)
         
-        Replace LATITUDE_VALUE and LONGITUDE_VALUE with the actual numerical coordinates.
-        Use decimal degrees with 6 decimal places of precision.
-        Do not include any explanations or additional text, only return the JSON object.
+        # Get the response from the LLM
+        llm_client = await get_client(get_llm)
+        response = await llm_client.ainvoke(geocoding_prompt)
+        logger.debug("LLM geocoding response: %s", response)
         
-        If you're not sure about the exact coordinates, provide your best estimate.
-        """
+        # Try to extract the coordinates as JSON from the response
+        data = parse_llm_json(response, ("latitude", "longitude"), ("latitude", "longitude"))
+        if data:
+            lat, lon = data["latitude"], data["longitude"]
+            logger.debug("LLM geocoded '%s' to coordinates: (%s, %s)", location, lat, lon)
+            return (lat, lon)
         
-        print(f"Asking LLM for coordinates of '{location}'...")
+        logger.debug("Failed to parse LLM geocoding response as JSON")
         
-        # Get the response from the LLM
-        response = llm.invoke(geocoding_prompt)
-        print(f"LLM geocoding response: {response}")
-        
-        # Try to extract JSON from the response
-        try:
-            # Look for JSON pattern in the response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                data = json.loads(json_str)
-                
-                # Extract latitude and longitude
-                lat = data.get("latitude")
-                lon = data.get("longitude")
-                
-                if lat is not None and lon is not None:
-                    # Convert to float if they're strings
-                    if isinstance(lat, str):
-                        lat = float(lat)
-                    if isinstance(lon, str):
-                        lon = float(lon)
-                        
-                    print(f"LLM geocoded '{location}' to coordinates: ({lat}, {lon})")
-                    return (lat, lon)
-            
-            # If JSON pattern not found or missing keys, try to parse the whole response
-            data = json.loads(response)
-            lat = data.get("latitude")
-            lon = data.get("longitude")
-            
-            if lat is not None and lon is not None:
-                # Convert to float if they're strings
-                if isinstance(lat, str):
-                    lat = float(lat)
-                if isinstance(lon, str):
-                    lon = float(lon)
-                    
-                print(f"LLM geocoded '{location}' to coordinates: ({lat}, {lon})")
+        # Try to extract coordinates using regex
+        coords_match = COORDINATES_RE.search(response)
+        if coords_match:
+            try:
+                lat = float(coords_match.group(1))
+                lon = float(coords_match.group(2))
+                logger.debug("Extracted coordinates from text: (%s, %s)", lat, lon)
                 return (lat, lon)
-                
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Failed to parse LLM geocoding response: {str(e)}")
-            
-            # Try to extract coordinates using regex
-            coords_match = re.search(r'(-?\d+\.?\d*)[,\s]+(-?\d+\.?\d*)', response)
-            if coords_match:
-                try:
-                    lat = float(coords_match.group(1))
-                    lon = float(coords_match.group(2))
-                    print(f"Extracted coordinates from text: ({lat}, {lon})")
-                    return (lat, lon)
-                except ValueError:
-                    pass
-        
-        print(f"LLM could not provide valid coordinates for '{location}'")
+            except ValueError:
+                pass
+        
+        logger.debug("LLM could not provide valid coordinates for '%s'", location)
         return None
         
     except Exception as e:
-        print(f"Error during LLM geocoding: {str(e)}")
+        logger.warning("Error during LLM geocoding: %s", e)
         return None
 
+def split_locations(location, api_key):
+    """
+    Split a resolved location such as "Paris and Berlin" into separate locations.
+    Commas are kept, since they usually separate a city from its region or country.
+    A place with "and" in its name ("Trinidad and Tobago") is kept whole: the parts are
+    only used when the full name has no geocoding result and every part has one.
+    """
+    locations = [part.strip() for part in LOCATION_SEPARATOR_RE.split(location)]
+    parts = list(dict.fromkeys(part for part in locations if part))
+    if len(parts) < 2 or not api_key:
+        return parts
+    
+    # Exact names only: the variations api_geocode_location tries would match "Paris and Berlin" as "Paris"
+    location = location.strip()
+    if geocode_exact(location, api_key):
+        return [location]
+    if all(_geocode_executor.map(lambda part: geocode_exact(part, api_key), parts)):
+        return parts
+    return [location]
+
+def geocode_exact(name, api_key):
+    """Geocode a location name exactly as given, reusing cached API results."""
+    return cache_get(_api_geocode_cache, name.lower(), GEOCODE_CACHE_TTL) or geocode_variation(name, api_key)
+
 def normalize_location(location):
     """
     Normalize location names to improve geocoding success rate.
@@ -332,7 +682,7 @@ def normalize_location(location):
     variations = [location]  # Start with the original location
     
     # Add variations without special characters
-    clean_location = re.sub(r'[^\w\s]', '', location)
+    clean_location = NON_WORD_RE.sub('', location)
     if clean_location != location:
         variations.append(clean_location)
     
@@ -356,59 +706,95 @@ def normalize_location(location):
     
     return unique_variations
 
+def geocode_variation(variation, api_key):
+    """
+    Look up a single location variation with OpenWeatherMap's geocoding API.
+    
+    Returns:
+        Tuple of (lat, lon), or None if the API has no result or the request fails
+    """
+    try:
+        logger.debug("Trying to geocode with API: '%s'", variation)
+        
+        # OpenWeatherMap geocoding API endpoint
+        geocoding_url = "http://api.openweathermap.org/geo/1.0/direct"
+        
+        # Parameters for the geocoding API
+        params = {
+            "q": variation,  # The requests library will handle URL encoding
+            "limit": 1,      # Get only the top result
+            "appid": api_key
+        }
+        
+        # Make the API request
+        response = http_client.session.get(geocoding_url, params=params, timeout=http_client.DEFAULT_TIMEOUT)
+        response.raise_for_status()  # Raise exception for HTTP errors
+        
+        # Parse the response
+        data = _loads(response.content)
+        logger.debug("Geocoding API response for '%s': %s", variation, data)
+        
+        # Check if we got any results
+        if data and len(data) > 0:
+            lat = data[0].get("lat")
+            lon = data[0].get("lon")
+            if lat is not None and lon is not None:
+                logger.debug("Successfully geocoded '%s' to coordinates: (%s, %s)", variation, lat, lon)
+                cache_set(_api_geocode_cache, variation.lower(), (lat, lon))
+                return (lat, lon)
+        
+        logger.debug("No results found for '%s'", variation)
+        
+    except Exception as e:
+        logger.warning("Error geocoding '%s': %s", variation, e)
+    
+    return None
+
 def api_geocode_location(location, api_key):
     """
     Convert a location name to latitude and longitude coordinates using OpenWeatherMap's geocoding API.
     """
     if not location or not api_key:
-        print("Error: Location or API key not provided for geocoding")
+        logger.warning("Location or API key not provided for geocoding")
         return None
     
-    # Get location variations to try
+    # Get location variations to try, most specific first
     location_variations = normalize_location(location)
-    print(f"Trying location variations with API: {location_variations}")
+    logger.debug("Trying location variations with API: %s", location_variations)
     
-    # Try each location variation
-    for variation in location_variations:
-        try:
-            print(f"Trying to geocode with API: '{variation}'")
-            
-            # OpenWeatherMap geocoding API endpoint
-            geocoding_url = "http://api.openweathermap.org/geo/1.0/direct"
-            
-            # URL encode the location parameter to handle spaces and special characters
-            encoded_location = urllib.parse.quote(variation)
-            print(f"URL encoded location: '{encoded_location}'")
-            
-            # Parameters for the geocoding API
-            params = {
-                "q": variation,  # The requests library will handle URL encoding
-                "limit": 1,      # Get only the top result
-                "appid": api_key
-            }
-            
-            # Make the API request
-            response = requests.get(geocoding_url, params=params)
-            response.raise_for_status()  # Raise exception for HTTP errors
-            
-            # Parse the response
-            data = response.json()
-            print(f"Geocoding API response for '{variation}': {data}")
-            
-            # Check if we got any results
-            if data and len(data) > 0:
-                lat = data[0].get("lat")
-                lon = data[0].get("lon")
-                if lat is not None and lon is not None:
-                    print(f"Successfully geocoded '{variation}' to coordinates: ({lat}, {lon})")
-                    return (lat, lon)
-            
-            print(f"No results found for '{variation}'")
-            
-        except Exception as e:
-            print(f"Error geocoding '{variation}': {str(e)}")
+    # The full name usually matches, so it is tried on its own before spending API calls on the rest
+    full_name = location_variations[0]
+    coordinates = geocode_exact(full_name, api_key)
+    if coordinates:
+        return coordinates
+    
+    # Different locations share variations ("London, Ontario" and "London" both try "London"),
+    # so a cached broader variation only counts once every more specific one has missed.
+    # Uncached variations up to the first cached one are looked up at once.
+    lookups = []
+    for variation in location_variations[1:]:
+        coordinates = cache_get(_api_geocode_cache, variation.lower(), GEOCODE_CACHE_TTL)
+        if coordinates:
+            lookups.append((variation, coordinates))
+            break
+        lookups.append((variation, _geocode_executor.submit(geocode_variation, variation, api_key)))
+    
+    # Prefer the earliest variation that has a result
+    try:
+        for variation, lookup in lookups:
+            if isinstance(lookup, Future):
+                coordinates = lookup.result()
+            else:
+                logger.debug("Using cached coordinates for '%s'", variation)
+                coordinates = lookup
+            if coordinates:
+                return coordinates
+    finally:
+        for variation, lookup in lookups:
+            if isinstance(lookup, Future):
+                lookup.cancel()
     
-    print(f"Could not geocode any variation of '{location}' with API")
+    logger.debug("Could not geocode any variation of '%s' with API", location)
     return None
 
 def get_weather_by_coordinates(lat, lon, api_key, units="metric"):
@@ -431,11 +817,11 @@ def get_weather_by_coordinates(lat, lon, api_key, units="metric"):
         }
         
         # Make the API request
-        response = requests.get(weather_url, params=params)
+        response = http_client.session.get(weather_url, params=params, timeout=http_client.DEFAULT_TIMEOUT)
         response.raise_for_status()  # Raise exception for HTTP errors
         
         # Parse the response
-        data = response.json()
+        data = _loads(response.content)
         
         # Format the weather data
         return format_weather_data(data, units), data
@@ -463,11 +849,11 @@ def get_forecast_by_coordinates(lat, lon, api_key, units="metric"):
         }
         
         # Make the API request
-        response = requests.get(forecast_url, params=params)
+        response = http_client.session.get(forecast_url, params=params, timeout=http_client.DEFAULT_TIMEOUT)
         response.raise_for_status()  # Raise exception for HTTP errors
         
         # Parse the response
-        data = response.json()
+        data = _loads(response.content)
         
         # Extract forecast for the rest of the day
         today_forecast = extract_today_forecast(data)
@@ -484,21 +870,20 @@ def extract_today_forecast(forecast_data):
     if not forecast_data or "list" not in forecast_data:
         return []
     
-    # Get the current date
-    current_date = datetime.now().date()
+    # Today's remaining window as Unix timestamps, ending at local midnight
+    now = datetime.now()
+    now_ts = now.timestamp()
+    midnight_ts = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
     
-    # Extract forecast entries for today
+    # Extract forecast entries for the rest of today in a single pass, comparing raw
+    # timestamps and only building a datetime for the entries that are kept
     today_forecast = []
     for entry in forecast_data["list"]:
-        # Convert timestamp to datetime
-        timestamp = entry["dt"]
-        entry_date = datetime.fromtimestamp(timestamp).date()
-        entry_time = datetime.fromtimestamp(timestamp).time()
-        
-        # Check if this entry is for today and in the future
-        if entry_date == current_date and datetime.fromtimestamp(timestamp) > datetime.now():
-            # Add a formatted time to the entry
-            entry["formatted_time"] = datetime.fromtimestamp(timestamp).strftime("%H:%M")
+        if now_ts < entry["dt"] < midnight_ts:
+            # Add the parsed and formatted time to the entry, so later steps don't parse it again
+            entry_datetime = datetime.fromtimestamp(entry["dt"])
+            entry["local_datetime"] = entry_datetime
+            entry["formatted_time"] = entry_datetime.strftime("%H:%M")
             today_forecast.append(entry)
     
     return today_forecast
@@ -534,60 +919,16 @@ def get_clothing_recommendation(weather_data, forecast_data=None):
         return "I can't provide clothing recommendations without weather data."
     
     try:
-        # Get current time
-        current_time = datetime.now()
-        
         # Initialize recommendations
-        current_recommendations = []
         forecast_recommendations = {}
         
         # Generate recommendations for current weather
         # Extract relevant weather information
         temp = weather_data["main"]["temp"]
-        description = weather_data["weather"][0]["description"].lower()
+        condition = weather_condition(weather_data["weather"][0].get("id", 0))
         wind_speed = weather_data["wind"]["speed"]
         
-        # Temperature-based recommendations
-        if temp < 0:
-            current_recommendations.append("heavy winter coat")
-            current_recommendations.append("hat, scarf, and gloves")
-            current_recommendations.append("thermal layers")
-            current_recommendations.append("insulated boots")
-        elif temp < 10:
-            current_recommendations.append("winter coat or heavy jacket")
-            current_recommendations.append("hat and gloves")
-            current_recommendations.append("warm layers")
-        elif temp < 15:
-            current_recommendations.append("light jacket or heavy sweater")
-            current_recommendations.append("long sleeves")
-        elif temp < 20:
-            current_recommendations.append("light sweater or long-sleeved shirt")
-        elif temp < 25:
-            current_recommendations.append("t-shirt or light top")
-            current_recommendations.append("light pants or jeans")
-        else:
-            current_recommendations.append("light, breathable clothing")
-            current_recommendations.append("shorts or light pants")
-            current_recommendations.append("sun protection")
-        
-        # Weather condition-based recommendations
-        if "rain" in description or "drizzle" in description or "shower" in description:
-            current_recommendations.append("raincoat or umbrella")
-            current_recommendations.append("waterproof shoes")
-        elif "snow" in description or "sleet" in description:
-            current_recommendations.append("waterproof boots")
-            current_recommendations.append("warm, waterproof jacket")
-        elif "thunderstorm" in description:
-            current_recommendations.append("stay indoors if possible")
-            current_recommendations.append("raincoat and umbrella if you must go out")
-        elif "clear" in description and temp > 20:
-            current_recommendations.append("sunglasses")
-            current_recommendations.append("sunscreen")
-            current_recommendations.append("hat for sun protection")
-        
-        # Wind-based recommendations
-        if wind_speed > 10:
-            current_recommendations.append("windbreaker or wind-resistant jacket")
+        current_recommendations = recommendations_for(temp, condition, wind_speed)
         
         # Generate recommendations for forecast periods if available
         if forecast_data:
@@ -599,11 +940,13 @@ def get_clothing_recommendation(weather_data, forecast_data=None):
             }
             
             for entry in forecast_data:
-                entry_time = datetime.fromtimestamp(entry["dt"]).time()
+                # Entries from extract_today_forecast already carry their parsed time
+                entry_datetime = entry.get("local_datetime") or datetime.fromtimestamp(entry["dt"])
+                hour = entry_datetime.hour
                 
-                if entry_time.hour < 12:
+                if hour < 12:
                     time_blocks["Morning"].append(entry)
-                elif entry_time.hour < 18:
+                elif hour < 18:
                     time_blocks["Afternoon"].append(entry)
                 else:
                     time_blocks["Evening"].append(entry)
@@ -617,67 +960,79 @@ def get_clothing_recommendation(weather_data, forecast_data=None):
                 middle_idx = len(entries) // 2
                 representative_entry = entries[middle_idx]
                 
-                block_recommendations = []
-                
                 # Extract weather information
                 temp = representative_entry["main"]["temp"]
-                description = representative_entry["weather"][0]["description"].lower()
+                condition = weather_condition(representative_entry["weather"][0].get("id", 0))
                 wind_speed = representative_entry["wind"]["speed"]
                 
-                # Temperature-based recommendations
-                if temp < 0:
-                    block_recommendations.append("heavy winter coat")
-                    block_recommendations.append("hat, scarf, and gloves")
-                    block_recommendations.append("thermal layers")
-                elif temp < 10:
-                    block_recommendations.append("winter coat or heavy jacket")
-                    block_recommendations.append("hat and gloves")
-                elif temp < 15:
-                    block_recommendations.append("light jacket or heavy sweater")
-                elif temp < 20:
-                    block_recommendations.append("light sweater or long-sleeved shirt")
-                elif temp < 25:
-                    block_recommendations.append("t-shirt or light top")
-                else:
-                    block_recommendations.append("light, breathable clothing")
-                    block_recommendations.append("sun protection")
-                
-                # Weather condition-based recommendations
-                if "rain" in description or "drizzle" in description:
-                    block_recommendations.append("raincoat or umbrella")
-                elif "snow" in description:
-                    block_recommendations.append("waterproof boots")
-                elif "clear" in description and temp > 20:
-                    block_recommendations.append("sunglasses")
-                
-                # Wind-based recommendations
-                if wind_speed > 10:
-                    block_recommendations.append("windbreaker")
-                
-                forecast_recommendations[block_name] = block_recommendations
+                forecast_recommendations[block_name] = recommendations_for(temp, condition, wind_speed, detailed=False)
         
-        # Format the recommendations
-        result = "Clothing recommendations:\n\n"
+        # Format the recommendations, joining the parts once at the end
+        parts = ["Clothing recommendations:\n\n"]
         
         # Current recommendations
-        result += "For now: " + ", ".join(current_recommendations) + ".\n\n"
+        parts.append(f"For now: {', '.join(current_recommendations)}.\n\n")
         
         # Forecast recommendations
         if forecast_recommendations:
-            result += "For the rest of the day:\n"
+            parts.append("For the rest of the day:\n")
             for block_name, recommendations in forecast_recommendations.items():
                 if recommendations:
-                    result += f"- {block_name}: " + ", ".join(recommendations) + ".\n"
+                    parts.append(f"- {block_name}: {', '.join(recommendations)}.\n")
         
-        return result
+        return "".join(parts)
             
-    except (KeyError, TypeError) as e:
+    except (KeyError, TypeError, AttributeError) as e:
         return f"Error generating clothing recommendations: {str(e)}"
 
 @app.get("/")
 async def root():
     return {"message": "Ollama Weather Agent API is running. Send POST requests to /chat endpoint."}
 
+# Readiness is re-checked at most this often, however frequently the probe polls
+READINESS_CACHE_TTL = 5.0  # seconds
+OLLAMA_PING_TIMEOUT = 0.2  # seconds
+_readiness = {"checked_at": None, "ready": False}
+
+# Request line of a probe in a uvicorn access log message, e.g. '"GET /readyz HTTP/1.1" 200'
+PROBE_REQUEST_RE = re.compile(r'"[A-Z]+ /(?:healthz|readyz)(?:\?\S*)? HTTP/')
+
+class HealthCheckLogFilter(logging.Filter):
+    """Keep liveness and readiness probes out of the uvicorn access log."""
+    
+    def filter(self, record):
+        return not PROBE_REQUEST_RE.search(record.getMessage())
+
+logging.getLogger("uvicorn.access").addFilter(HealthCheckLogFilter())
+
+def ping_ollama():
+    """Return True if the Ollama server answers within OLLAMA_PING_TIMEOUT."""
+    # A bare request rather than the shared session: its retries would stretch a
+    # down server's answer well past the timeout
+    try:
+        response = requests.head(ollama_url, timeout=OLLAMA_PING_TIMEOUT)
+        return response.status_code < 500
+    except Exception:
+        return False
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe; never touches the LLM or any other backend."""
+    return {"ok": True}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe; reports whether Ollama is reachable, checked at most every few seconds."""
+    now = time.monotonic()
+    checked_at = _readiness["checked_at"]
+    if checked_at is None or now - checked_at >= READINESS_CACHE_TTL:
+        _readiness["ready"] = await run_in_threadpool(ping_ollama)
+        _readiness["checked_at"] = now
+    
+    if _readiness["ready"]:
+        return {"ok": True}
+    return JSONResponse({"ok": False}, status_code=503)
+
 if __name__ == "__main__":
     # Set default values
     host = "0.0.0.0"
@@ -707,5 +1062,6 @@ if __name__ == "__main__":
         print(f"Error getting debug from config: {e}")
     
     print(f"Starting server on {host}:{port} with debug={debug}")
+    import uvicorn
     uvicorn.run("src.app:app", host=host, port=port, reload=debug)
 
@@ -0,0 +1,89 @@
+import bisect
+
+# Clothing recommendations by temperature band: below 0, below 10, below 15, below 20, below 25, warmer
+TEMP_THRESHOLDS = (0, 10, 15, 20, 25)
+CURRENT_TEMP_RECS = (
+    ("heavy winter coat", "hat, scarf, and gloves", "thermal layers", "insulated boots"),
+    ("winter coat or heavy jacket", "hat and gloves", "warm layers"),
+    ("light jacket or heavy sweater", "long sleeves"),
+    ("light sweater or long-sleeved shirt",),
+    ("t-shirt or light top", "light pants or jeans"),
+    ("light, breathable clothing", "shorts or light pants", "sun protection"),
+)
+FORECAST_TEMP_RECS = (
+    ("heavy winter coat", "hat, scarf, and gloves", "thermal layers"),
+    ("winter coat or heavy jacket", "hat and gloves"),
+    ("light jacket or heavy sweater",),
+    ("light sweater or long-sleeved shirt",),
+    ("t-shirt or light top",),
+    ("light, breathable clothing", "sun protection"),
+)
+
+# OpenWeatherMap condition groups by weather id: 2xx thunderstorm, 3xx drizzle, 5xx rain,
+# 6xx snow (including sleet). 800 is a clear sky; 801-804 are clouds.
+WEATHER_BUCKET = {2: "thunderstorm", 3: "drizzle", 5: "rain", 6: "snow"}
+
+# Weather condition recommendations by condition group
+CURRENT_CONDITION_RECS = {
+    "rain": ("raincoat or umbrella", "waterproof shoes"),
+    "drizzle": ("raincoat or umbrella", "waterproof shoes"),
+    "snow": ("waterproof boots", "warm, waterproof jacket"),
+    "thunderstorm": ("stay indoors if possible", "raincoat and umbrella if you must go out"),
+}
+FORECAST_CONDITION_RECS = {
+    "rain": ("raincoat or umbrella",),
+    "drizzle": ("raincoat or umbrella",),
+    "thunderstorm": ("raincoat or umbrella",),
+    "snow": ("waterproof boots",),
+}
+CURRENT_CLEAR_RECS = ("sunglasses", "sunscreen", "hat for sun protection")
+FORECAST_CLEAR_RECS = ("sunglasses",)
+
+def weather_condition(weather_id):
+    """
+    Map an OpenWeatherMap weather id to its condition group.
+    
+    Args:
+        weather_id: The weather[0]["id"] code from an OpenWeatherMap response
+    
+    Returns:
+        "thunderstorm", "drizzle", "rain", "snow" or "clear", or None for other conditions
+    """
+    if weather_id == 800:
+        return "clear"
+    return WEATHER_BUCKET.get(weather_id // 100)
+
+def recommendations_for(temp, condition, wind_speed, detailed=True):
+    """
+    Build the clothing recommendations for one set of conditions.
+    
+    Args:
+        temp: Temperature
+        condition: Condition group from weather_condition()
+        wind_speed: Wind speed
+        detailed: Use the fuller lists for current weather rather than the forecast ones
+    
+    Returns:
+        List of recommendation strings
+    """
+    if detailed:
+        temp_recs, condition_recs, clear_recs = CURRENT_TEMP_RECS, CURRENT_CONDITION_RECS, CURRENT_CLEAR_RECS
+        wind_rec = "windbreaker or wind-resistant jacket"
+    else:
+        temp_recs, condition_recs, clear_recs = FORECAST_TEMP_RECS, FORECAST_CONDITION_RECS, FORECAST_CLEAR_RECS
+        wind_rec = "windbreaker"
+    
+    # Temperature-based recommendations; bisect_right keeps each band's upper bound exclusive
+    recommendations = list(temp_recs[bisect.bisect_right(TEMP_THRESHOLDS, temp)])
+    
+    # Weather condition-based recommendations
+    if condition in condition_recs:
+        recommendations.extend(condition_recs[condition])
+    elif condition == "clear" and temp > 20:
+        recommendations.extend(clear_recs)
+    
+    # Wind-based recommendations
+    if wind_speed > 10:
+        recommendations.append(wind_rec)
+    
+    return recommendations
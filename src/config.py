@@ -1,14 +1,76 @@
 import os
-import json
-from typing import Dict, Any
+import logging
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Any, Tuple
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
+# Prefer orjson for parsing config files, falling back to the standard library
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+def _keep_alive(value: str):
+    """
+    Ollama reads a string keep_alive as a duration ("5m"), and a number as seconds
+    (with -1 meaning forever), so integer-looking values are passed on as numbers.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+# Environment variables that override config file values: (variable, section, key, converter).
+# The keep-alive variable is not OLLAMA_KEEP_ALIVE, which configures the Ollama server itself.
+_ENV_OVERRIDES = (
+    ("API_PORT", "api", "port", int),
+    ("OLLAMA_BASE_URL", "ollama", "base_url", str),
+    ("OLLAMA_MODEL", "ollama", "default_model", str),
+    ("PLANNER_OLLAMA_KEEP_ALIVE", "ollama", "keep_alive", _keep_alive),
+    ("OPENWEATHER_API_KEY", "weather", "api_key", str),
+)
+
+# Parsed config files keyed by (path, modification time), so a changed file is read again
+_FILE_CACHE: Dict[Tuple[str, float], Dict[str, Any]] = {}
+
+# .env is searched for and loaded once per process, however many Config instances are made
+_dotenv_loaded = False
+
+# Cached result of a lookup for a key that is not in the config, so each caller still gets its own default
+_MISSING = object()
+
+def _freeze(value):
+    """Return a read-only copy of parsed JSON, with mappings as MappingProxyType and lists as tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 class Config:
     """
     Configuration manager that loads settings from config files and environment variables.
     Environment variables take precedence over config file values.
+    There is one instance per config file path.
     """
     
+    # Loaded instances keyed by config file path
+    _instances: Dict[str, "Config"] = {}
+    
+    def __new__(cls, config_path: str = None):
+        config_path = cls._resolve_path(config_path)
+        instance = cls._instances.get(config_path)
+        if instance is None:
+            instance = super().__new__(cls)
+            instance._initialized = False
+            instance = cls._instances.setdefault(config_path, instance)
+        return instance
+    
     def __init__(self, config_path: str = None):
         """
         Initialize configuration manager.
@@ -16,48 +78,104 @@ class Config:
         Args:
             config_path: Path to the JSON configuration file
         """
+        # Already loaded by an earlier Config() for the same path
+        if self._initialized:
+            return
+        
         # Load environment variables
-        load_dotenv()
+        global _dotenv_loaded
+        if not _dotenv_loaded:
+            load_dotenv()
+            _dotenv_loaded = True
         
-        # Default config path
-        if config_path is None:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            config_path = os.path.join(base_dir, "config", "default_config.json")
+        config_path = self._resolve_path(config_path)
+        
+        # Load config from file. The parsed file is shared with other instances through
+        # _FILE_CACHE, so it is only ever read; environment overrides live in their own layer.
+        self._base = self._load_config_file(config_path)
+        self._overrides: Dict[str, Dict[str, Any]] = {}  # section -> key -> value
         
-        # Load config from file
-        self.config = self._load_config_file(config_path)
+        # Resolved dot-path lookups, keyed by the full key string
+        self._get_cache: Dict[str, Any] = {}
+        
+        # Dot-separated keys already split into their parts
+        self._split_cache: Dict[str, Tuple[str, ...]] = {}
         
         # Override with environment variables
         self._override_from_env()
+        
+        self._initialized = True
+    
+    @staticmethod
+    def _resolve_path(config_path: str = None) -> str:
+        """Return the config file path, defaulting to config/default_config.json."""
+        if config_path is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            config_path = os.path.join(base_dir, "config", "default_config.json")
+        return config_path
     
-    def _load_config_file(self, config_path: str) -> Dict[str, Any]:
-        """Load configuration from a JSON file."""
+    def _load_config_file(self, config_path: str) -> Mapping:
+        """Load configuration from a JSON file as a read-only mapping."""
         try:
             if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    return json.load(f)
+                try:
+                    cache_key = (config_path, os.path.getmtime(config_path))
+                except OSError:
+                    cache_key = None
+                
+                data = _FILE_CACHE.get(cache_key) if cache_key else None
+                if data is None:
+                    with open(config_path, 'rb') as f:
+                        data = _freeze(_loads(f.read()))
+                    if cache_key:
+                        _FILE_CACHE[cache_key] = data
+                
+                return data
             else:
-                print(f"Warning: Config file not found at {config_path}")
-                return {}
+                logger.warning("Config file not found at %s", config_path)
+                return MappingProxyType({})
         except Exception as e:
-            print(f"Error loading config file: {str(e)}")
-            return {}
+            logger.error("Error loading config file: %s", e)
+            return MappingProxyType({})
     
     def _override_from_env(self):
         """Override configuration with environment variables."""
-        # API settings
-        if os.getenv("API_PORT"):
-            self.config.setdefault("api", {})["port"] = int(os.getenv("API_PORT"))
-        
-        # Ollama settings
-        if os.getenv("OLLAMA_BASE_URL"):
-            self.config.setdefault("ollama", {})["base_url"] = os.getenv("OLLAMA_BASE_URL")
-        if os.getenv("OLLAMA_MODEL"):
-            self.config.setdefault("ollama", {})["default_model"] = os.getenv("OLLAMA_MODEL")
-        
-        # Weather settings
-        if os.getenv("OPENWEATHER_API_KEY"):
-            self.config.setdefault("weather", {})["api_key"] = os.getenv("OPENWEATHER_API_KEY")
+        for env_var, section, key, convert in _ENV_OVERRIDES:
+            value = os.getenv(env_var)
+            if value:
+                self._overrides.setdefault(section, {})[key] = convert(value)
+        
+        # Lookups made before the overrides are stale now
+        self._get_cache.clear()
+    
+    @property
+    def config(self) -> Mapping:
+        """
+        Read-only view of the configuration with overrides applied.
+        
+        Writing to it raises TypeError; use set() to change a value.
+        """
+        merged = dict(self._base)
+        for section, overrides in self._overrides.items():
+            file_section = merged.get(section)
+            section_values = {**file_section, **overrides} if isinstance(file_section, Mapping) else dict(overrides)
+            merged[section] = MappingProxyType(section_values)
+        return MappingProxyType(merged)
+    
+    def set(self, key: str, value: Any):
+        """
+        Override a configuration value for this instance.
+        
+        Args:
+            key: "section.key" path of the value (e.g., "api.port")
+            value: New value
+        """
+        section, _, name = key.partition('.')
+        if not section or not name or '.' in name:
+            raise ValueError(f"Config.set expects a 'section.key' path, got {key!r}")
+        
+        self._overrides.setdefault(section, {})[name] = _freeze(value)
+        self._get_cache.clear()
     
     def get(self, key: str, default=None):
         """
@@ -70,18 +188,55 @@ class Config:
         Returns:
             The configuration value or default
         """
-        parts = key.split('.')
-        value = self.config
+        try:
+            value = self._get_cache[key]
+        except KeyError:
+            value = self._lookup(key)
+            self._get_cache[key] = value
+        
+        return default if value is _MISSING else value
+    
+    def _lookup(self, key: str):
+        """Walk the config tree for a dot-separated key, returning _MISSING if it is not there."""
+        parts = self._split_cache.get(key)
+        if parts is None:
+            parts = tuple(key.split('.'))
+            self._split_cache[key] = parts
+        
+        value = self._base
+        overrides = self._overrides.get(parts[0])
+        if overrides:
+            if len(parts) == 1:
+                file_section = self._base.get(parts[0])
+                section = {**file_section, **overrides} if isinstance(file_section, Mapping) else dict(overrides)
+                return MappingProxyType(section)
+            if parts[1] in overrides:
+                value = overrides[parts[1]]
+                parts = parts[2:]
         
         for part in parts:
-            if isinstance(value, dict) and part in value:
+            if isinstance(value, Mapping) and part in value:
                 value = value[part]
             else:
-                return default
+                return _MISSING
                 
         return value
 
+class _LazyConfig:
+    """
+    Stand-in for the shared Config that only loads .env and the config file
+    when a setting is first read.
+    """
+    
+    def __init__(self):
+        self._config = None
+    
+    def __getattr__(self, name):
+        if self._config is None:
+            self._config = Config()
+        return getattr(self._config, name)
+
 # Create a singleton instance
-config = Config()
+config = _LazyConfig()
 
 
@@ -0,0 +1,26 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Timeout for OpenWeatherMap requests as (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+
+def create_session() -> requests.Session:
+    """
+    Create a requests session with a pooled, retrying adapter.
+
+    Returns:
+        Session that keeps connections alive between requests
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.1)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Shared session so geocoding, weather and forecast calls reuse keep-alive connections
+session = create_session()
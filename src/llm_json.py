@@ -0,0 +1,92 @@
+import re
+
+# Prefer orjson for parsing LLM output, falling back to the standard library.
+# Both decode errors subclass ValueError.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+# Markdown code fences that models often wrap JSON answers in
+FENCE_START_RE = re.compile(r'^```(?:json)?\s*\n?')
+FENCE_END_RE = re.compile(r'\n?```\s*$')
+
+def extract_json_object(text):
+    """
+    Return the first balanced {...} object in text, or None.
+    
+    Walks forward from the first '{' tracking brace depth and skipping braces
+    inside JSON strings, so trailing prose or a second object is not included.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    
+    # Unbalanced braces
+    return None
+
+def parse_llm_json(text, required_keys=(), float_keys=()):
+    """
+    Parse a JSON object out of an LLM response in a single pass of fallbacks.
+    
+    Stages: strip markdown code fences, parse the whole text directly, fall back
+    to the first balanced {...} object, check the required keys are present,
+    then coerce float_keys to float.
+    
+    Args:
+        text: Raw LLM response
+        required_keys: Keys that must be present in the object
+        float_keys: Keys whose values are converted to float
+    
+    Returns:
+        The parsed dict, or None if no valid object could be extracted
+    """
+    if not text:
+        return None
+    
+    text = FENCE_END_RE.sub('', FENCE_START_RE.sub('', text.strip()))
+    
+    try:
+        data = _loads(text)
+    except ValueError:
+        json_str = extract_json_object(text)
+        if not json_str:
+            return None
+        try:
+            data = _loads(json_str)
+        except ValueError:
+            return None
+    
+    if not isinstance(data, dict) or any(data.get(key) is None for key in required_keys):
+        return None
+    
+    try:
+        for key in float_keys:
+            data[key] = float(data[key])
+    except (TypeError, ValueError):
+        return None
+    
+    return data
@@ -1,19 +1,49 @@
 import os
-import requests
-from typing import Dict, Any, Optional
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from requests.exceptions import RequestException
+from typing import Dict, Any, Optional, Tuple, Union
 from src.config import config
+from src import http_client
+
+logger = logging.getLogger(__name__)
+
+# Formatted weather is reused for a short while, as key -> (stored_at, result)
+CACHE_MAX_ENTRIES = 256
+
+# Runs the forecast request while the calling thread fetches current weather
+_forecast_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="forecast")
 
 class WeatherTool:
     """Tool for fetching weather data from OpenWeatherMap API."""
     
+    WEATHER_TEMPLATE = (
+        "Weather in {city}, {country}: {description}. "
+        "Temperature: {temp}{temp_unit} (feels like {feels_like}{temp_unit}). "
+        "Humidity: {humidity}%. Wind speed: {wind_speed} {wind_unit}."
+    )
+    
     def __init__(self):
         """Initialize the weather tool with API key from configuration."""
         self.api_key = config.get("weather.api_key") or os.getenv("OPENWEATHER_API_KEY")
         if not self.api_key:
-            print("Warning: OpenWeather API key not found in configuration or environment variables.")
+            logger.warning("OpenWeather API key not found in configuration or environment variables.")
         
         self.base_url = config.get("weather.api_url", "https://api.openweathermap.org/data/2.5/weather")
+        self.forecast_url = config.get("weather.forecast_url", "https://api.openweathermap.org/data/2.5/forecast")
         self.units = config.get("weather.units", "metric")
+        
+        # Use °C or °F based on units
+        metric = self.units == "metric"
+        self._temp_unit = "°C" if metric else "°F"
+        self._wind_unit = "m/s" if metric else "mph"
+        
+        # Query parameters shared by every request
+        self._base_params = {"appid": self.api_key, "units": self.units}
+        
+        self._cache_ttl = config.get("weather.cache_ttl", 60)  # seconds
+        self._cache = {}  # (lowercased location, units) -> formatted weather
     
     def get_weather(self, location: str) -> str:
         """
@@ -28,44 +58,83 @@ class WeatherTool:
         if not self.api_key:
             return "Error: OpenWeather API key not configured."
         
+        cache_key = (location.strip().lower(), self.units)
+        entry = self._cache.get(cache_key)
+        if entry and time.monotonic() - entry[0] < self._cache_ttl:
+            return entry[1]
+        
         try:
-            params = {
-                "q": location,
-                "appid": self.api_key,
-                "units": self.units
-            }
+            params = dict(self._base_params, q=location)
             
-            response = requests.get(self.base_url, params=params)
+            response = http_client.session.get(self.base_url, params=params, timeout=http_client.DEFAULT_TIMEOUT)
             response.raise_for_status()  # Raise exception for HTTP errors
             
             data = response.json()
-            return self._format_weather_data(data)
+            result = self._format_weather_data(data)
+            
+            if cache_key not in self._cache and len(self._cache) >= CACHE_MAX_ENTRIES:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[cache_key] = (time.monotonic(), result)
+            return result
             
-        except requests.exceptions.RequestException as e:
+        except RequestException as e:
             return f"Error fetching weather data: {str(e)}"
     
-    def _format_weather_data(self, data: Dict[str, Any]) -> str:
-        """Format the weather data into a readable string."""
+    def get_forecast(self, location: str) -> Union[Dict[str, Any], str]:
+        """
+        Get the 5 day / 3 hour forecast for a location.
+        
+        Args:
+            location: City name or location
+            
+        Returns:
+            Forecast data as returned by the API, or a string describing the error
+        """
+        if not self.api_key:
+            return "Error: OpenWeather API key not configured."
+        
         try:
-            city = data["name"]
-            country = data["sys"]["country"]
-            temp = data["main"]["temp"]
-            feels_like = data["main"]["feels_like"]
-            description = data["weather"][0]["description"]
-            humidity = data["main"]["humidity"]
-            wind_speed = data["wind"]["speed"]
+            params = dict(self._base_params, q=location)
             
-            # Use °C or °F based on units
-            temp_unit = "°C" if self.units == "metric" else "°F"
-            wind_unit = "m/s" if self.units == "metric" else "mph"
+            response = http_client.session.get(self.forecast_url, params=params, timeout=http_client.DEFAULT_TIMEOUT)
+            response.raise_for_status()
+            return response.json()
             
-            return (
-                f"Weather in {city}, {country}: {description}. "
-                f"Temperature: {temp}{temp_unit} (feels like {feels_like}{temp_unit}). "
-                f"Humidity: {humidity}%. Wind speed: {wind_speed} {wind_unit}."
-            )
-        except KeyError as e:
-            return f"Error parsing weather data: {str(e)}"
+        except RequestException as e:
+            return f"Error fetching forecast data: {str(e)}"
+    
+    def get_weather_and_forecast(self, location: str) -> Tuple[str, Union[Dict[str, Any], str]]:
+        """
+        Get current weather and the forecast for a location, with both requests in flight at once.
+        
+        Args:
+            location: City name or location
+            
+        Returns:
+            Tuple of (formatted current weather, forecast data or error string)
+        """
+        forecast = _forecast_executor.submit(self.get_forecast, location)
+        return self.get_weather(location), forecast.result()
+    
+    def _format_weather_data(self, data: Dict[str, Any]) -> str:
+        """Format the weather data into a readable string."""
+        main = data.get("main") or {}
+        weather = data.get("weather") or [{}]
+        fields = {
+            "city": data.get("name"),
+            "country": (data.get("sys") or {}).get("country"),
+            "description": weather[0].get("description"),
+            "temp": main.get("temp"),
+            "feels_like": main.get("feels_like"),
+            "humidity": main.get("humidity"),
+            "wind_speed": (data.get("wind") or {}).get("speed")
+        }
+        
+        missing = [name for name, value in fields.items() if value is None]
+        if missing:
+            return f"Error parsing weather data: missing {', '.join(missing)}"
+        
+        return self.WEATHER_TEMPLATE.format(temp_unit=self._temp_unit, wind_unit=self._wind_unit, **fields)
 
 if __name__ == "__main__":
     # Simple test if run directly
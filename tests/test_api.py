@@ -1,21 +1,32 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import os
 import sys
 import json
 import re
+import asyncio
+import threading
+import logging
 from fastapi.testclient import TestClient
 
 # Add the src directory to the path so we can import our modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import after path setup
+from src import app as app_module
 from src.app import app
 
 class TestAPI(unittest.TestCase):
     
     def setUp(self):
         self.client = TestClient(app)
+        
+        # Cached locations and coordinates would otherwise leak between tests
+        app_module._location_cache.clear()
+        app_module._geocode_cache.clear()
+        app_module._response_cache.clear()
+        app_module._api_geocode_cache.clear()
+        app_module._readiness["checked_at"] = None
     
     def test_root_endpoint(self):
         """Test the root endpoint returns the expected message."""
@@ -23,10 +34,64 @@ class TestAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("Ollama Weather Agent API is running", response.json()["message"])
     
-    @patch('src.app.LLMChain')
+    @patch('src.app.get_llm')
+    def test_healthz_endpoint(self, mock_get_llm):
+        """Test the liveness probe answers without touching the LLM."""
+        response = self.client.get("/healthz")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"ok": True})
+        mock_get_llm.assert_not_called()
+    
+    @patch('src.app.ping_ollama')
+    def test_readyz_endpoint_caches_ollama_ping(self, mock_ping):
+        """Test the readiness probe reports Ollama's state and reuses a recent check."""
+        mock_ping.return_value = False
+        
+        for _ in range(2):
+            response = self.client.get("/readyz")
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json(), {"ok": False})
+        mock_ping.assert_called_once()
+        
+        # Once the cached result expires Ollama is pinged again
+        app_module._readiness["checked_at"] = None
+        mock_ping.return_value = True
+        response = self.client.get("/readyz")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"ok": True})
+    
+    @patch('src.app.requests.head')
+    def test_ping_ollama_makes_one_bare_request(self, mock_head):
+        """Test the readiness ping bypasses the retrying shared session."""
+        mock_head.side_effect = app_module.requests.ConnectionError()
+        self.assertFalse(app_module.ping_ollama())
+        mock_head.assert_called_once_with(app_module.ollama_url, timeout=app_module.OLLAMA_PING_TIMEOUT)
+        
+        mock_head.side_effect = None
+        mock_head.return_value = MagicMock(status_code=200)
+        self.assertTrue(app_module.ping_ollama())
+    
+    def test_health_check_log_filter(self):
+        """Test probe requests are dropped from the access log by their request line."""
+        log_filter = app_module.HealthCheckLogFilter()
+        def record(*args):
+            return logging.LogRecord("uvicorn.access", logging.INFO, __file__, 0,
+                                     '%s - "%s %s HTTP/%s" %d', args, None)
+        self.assertFalse(log_filter.filter(record("127.0.0.1:5000", "GET", "/readyz", "1.1", 200)))
+        self.assertFalse(log_filter.filter(record("127.0.0.1:5000", "GET", "/healthz?x=1", "1.1", 200)))
+        self.assertTrue(log_filter.filter(record("127.0.0.1:5000", "POST", "/chat", "1.1", 200)))
+        # Records with other argument layouts pass through untouched
+        self.assertTrue(log_filter.filter(logging.LogRecord("uvicorn.access", logging.INFO, __file__, 0,
+                                                            "plain message", None, None)))
+    
+    @patch('src.app.weather_tool', MagicMock(api_key="test_key", units="metric"))
+    @patch('src.app.geocode_exact', return_value=(51.5074, -0.1278))
+    @patch('src.app.location_resolution_chain')
     @patch('src.app.get_weather_by_coordinates')
     @patch('src.app.llm_geocode_location')
-    def test_chat_endpoint_weather_query(self, mock_geocode, mock_get_weather, mock_llm_chain):
+    @patch('src.app.api_geocode_location')
+    def test_chat_endpoint_weather_query(self, mock_geocode, mock_llm_geocode, mock_get_weather, mock_chain,
+                                         mock_geocode_exact):
         """Test the chat endpoint with a weather query."""
         # Configure mocks
         mock_geocode.return_value = (51.5074, -0.1278)  # London coordinates
@@ -49,10 +114,8 @@ class TestAPI(unittest.TestCase):
             weather_data
         )
         
-        # Mock LLMChain for location resolution
-        mock_chain_instance = MagicMock()
-        mock_chain_instance.run.return_value = '{"location": "London"}'
-        mock_llm_chain.return_value = mock_chain_instance
+        # Mock the location resolution chain
+        mock_chain.arun = AsyncMock(return_value='{"location": "London"}')
         
         # Make request
         response = self.client.post(
@@ -66,25 +129,25 @@ class TestAPI(unittest.TestCase):
         self.assertIn("London", response.json()["response"])
         self.assertIn("light rain", response.json()["response"])
         
-        # Verify location resolution was called
-        mock_llm_chain.assert_called()
+        # Verify the simple "weather in <place>" query didn't need the LLM to find the location
+        mock_chain.arun.assert_not_called()
+        mock_geocode_exact.assert_called_once_with("London", "test_key")
         
-        # Verify geocoding was called with London
+        # Verify the geocoding API was called with London and the LLM was not needed
         mock_geocode.assert_called_once()
         self.assertEqual(mock_geocode.call_args[0][0], "London")
+        mock_llm_geocode.assert_not_called()
         
         # Verify weather data was fetched with the correct coordinates
         mock_get_weather.assert_called_once()
         self.assertEqual(mock_get_weather.call_args[0][0], 51.5074)
         self.assertEqual(mock_get_weather.call_args[0][1], -0.1278)
     
-    @patch('src.app.LLMChain')
-    def test_chat_endpoint_non_weather_query(self, mock_llm_chain):
+    @patch('src.app.general_chain')
+    def test_chat_endpoint_non_weather_query(self, mock_chain):
         """Test the chat endpoint with a non-weather query."""
-        # Mock LLMChain
-        mock_chain_instance = MagicMock()
-        mock_chain_instance.run.return_value = "Python is a popular programming language known for its readability and versatility."
-        mock_llm_chain.return_value = mock_chain_instance
+        # Mock the general query chain
+        mock_chain.arun = AsyncMock(return_value="Python is a popular programming language known for its readability and versatility.")
         
         # Make request
         response = self.client.post(
@@ -98,8 +161,252 @@ class TestAPI(unittest.TestCase):
         self.assertIn("Python", response.json()["response"])
         
         # Verify correct prompt was used
-        mock_llm_chain.assert_called_once()
-        self.assertEqual(mock_chain_instance.run.call_args[1]["query"], "Tell me about Python programming language")
+        mock_chain.arun.assert_called_once()
+        self.assertEqual(mock_chain.arun.call_args[1]["query"], "Tell me about Python programming language")
+    
+    @patch('src.app.get_forecast_by_coordinates')
+    @patch('src.app.get_weather_by_coordinates')
+    @patch('src.app.api_geocode_location')
+    @patch('src.app.location_resolution_chain')
+    def test_chat_endpoint_routes_forecast_query_to_weather(self, mock_chain, mock_geocode,
+                                                            mock_get_weather, mock_get_forecast):
+        """Test that weather queries without the word 'weather' are still routed to the weather branch."""
+        mock_geocode.return_value = (48.8566, 2.3522)
+        mock_get_weather.return_value = ("Weather in Paris, FR: light rain.", None)
+        mock_get_forecast.return_value = ([], None)
+        
+        mock_chain.arun = AsyncMock(return_value='{"location": "Paris"}')
+        
+        response = self.client.post(
+            "/chat",
+            json={"text": "Will it rain in Paris?"}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Paris", response.json()["response"])
+        mock_geocode.assert_called_once()
+        self.assertEqual(mock_geocode.call_args[0][0], "Paris")
+    
+    @patch('src.app.get_forecast_by_coordinates')
+    @patch('src.app.get_weather_by_coordinates')
+    @patch('src.app.geocode_variation')
+    @patch('src.app.api_geocode_location')
+    @patch('src.app.location_resolution_chain')
+    def test_chat_endpoint_multiple_locations(self, mock_chain, mock_geocode, mock_geocode_variation,
+                                              mock_get_weather, mock_get_forecast):
+        """Test that a query about several locations looks up the weather for each one."""
+        coordinates = {"Paris": (48.8566, 2.3522), "Berlin": (52.52, 13.405)}
+        mock_geocode.side_effect = lambda location, key: coordinates[location]
+        mock_geocode_variation.side_effect = lambda location, key: coordinates.get(location)
+        mock_get_weather.side_effect = lambda lat, lon, key, units: (f"Weather at {lat}, {lon}: clear sky.", None)
+        mock_get_forecast.return_value = ([], None)
+        
+        mock_chain.arun = AsyncMock(return_value='{"location": "Paris and Berlin"}')
+        
+        response = self.client.post(
+            "/chat",
+            json={"text": "What's the weather in Paris and Berlin?"}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        text = response.json()["response"]
+        self.assertIn("weather in Paris", text)
+        self.assertIn("weather in Berlin", text)
+        self.assertEqual(sorted(call[0][0] for call in mock_geocode.call_args_list), ["Berlin", "Paris"])
+        self.assertEqual(mock_get_weather.call_count, 2)
+    
+    @patch('src.app.http_client.session')
+    def test_api_geocode_location_caches_variations(self, mock_session):
+        """Test that a geocoded variation is reused by later lookups without another API call."""
+        mock_session.get.return_value.content = b'[{"lat": 51.5074, "lon": -0.1278}]'
+        
+        self.assertEqual(app_module.api_geocode_location("London", "key"), (51.5074, -0.1278))
+        self.assertEqual(app_module.api_geocode_location("london", "key"), (51.5074, -0.1278))
+        mock_session.get.assert_called_once()
+    
+    @patch('src.app.http_client.session')
+    def test_api_geocode_location_prefers_earliest_variation(self, mock_session):
+        """Test that when several variations match, the most specific one wins."""
+        results = {"New York": [{"lat": 40.7128, "lon": -74.006}], "New": [{"lat": 1.0, "lon": 2.0}]}
+        
+        def fake_get(url, params, timeout):
+            response = MagicMock()
+            response.content = json.dumps(results[params["q"]]).encode()
+            return response
+        mock_session.get.side_effect = fake_get
+        
+        self.assertEqual(app_module.api_geocode_location("New York", "key"), (40.7128, -74.006))
+    
+    @patch('src.app.http_client.session')
+    def test_api_geocode_location_skips_cached_broader_variation(self, mock_session):
+        """Test that a cached "London" doesn't answer for the more specific "London, Ontario"."""
+        results = {"London": [{"lat": 51.5074, "lon": -0.1278}], "London, Ontario": [{"lat": 42.9849, "lon": -81.2453}]}
+        
+        def fake_get(url, params, timeout):
+            response = MagicMock()
+            response.content = json.dumps(results.get(params["q"], [])).encode()
+            return response
+        mock_session.get.side_effect = fake_get
+        
+        self.assertEqual(app_module.api_geocode_location("London", "key"), (51.5074, -0.1278))
+        self.assertEqual(app_module.api_geocode_location("London, Ontario", "key"), (42.9849, -81.2453))
+        
+        # A specific variation the API doesn't know still falls back to the cached broader one
+        self.assertEqual(app_module.api_geocode_location("London, Nowhere", "key"), (51.5074, -0.1278))
+    
+    @patch('src.app.http_client.session')
+    def test_api_geocode_location_falls_back_to_country(self, mock_session):
+        """Test that the full name is tried alone first, and that every variation down to the country is kept."""
+        results = {"Paris, France": [{"lat": 48.8566, "lon": 2.3522}], "France": [{"lat": 46.6034, "lon": 1.8883}]}
+        
+        def fake_get(url, params, timeout):
+            response = MagicMock()
+            response.content = json.dumps(results.get(params["q"], [])).encode()
+            return response
+        mock_session.get.side_effect = fake_get
+        
+        self.assertEqual(app_module.api_geocode_location("Paris, France", "key"), (48.8566, 2.3522))
+        mock_session.get.assert_called_once()
+        
+        self.assertEqual(app_module.api_geocode_location("Atlantis, France", "key"), (46.6034, 1.8883))
+    
+    @patch('src.app.llm')
+    def test_llm_geocode_location_parses_fenced_json(self, mock_llm):
+        """Test that LLM coordinates wrapped in a code fence are parsed and converted to floats."""
+        mock_llm.ainvoke = AsyncMock(return_value='```json\n{"latitude": "48.8566", "longitude": 2.3522}\n```')
+        
+        self.assertEqual(asyncio.run(app_module.llm_geocode_location("Paris")), (48.8566, 2.3522))
+        self.assertIn("Location: Paris", mock_llm.ainvoke.call_args[0][0])
+    
+    def test_extract_location_from_text(self):
+        """Test location extraction from JSON answers and the regex fallbacks."""
+        self.assertEqual(app_module.extract_location_from_text('Sure! {"location": "New York"}'),
+                         ("New York", True))
+        self.assertEqual(app_module.extract_location_from_text('{"city": "Paris"}'), (None, True))
+        self.assertEqual(app_module.extract_location_from_text('location: "Berlin"'), ("Berlin", False))
+        self.assertEqual(app_module.extract_location_from_text("what's the weather in Rome?"), ("Rome", False))
+        self.assertEqual(app_module.extract_location_from_text("no idea"), (None, False))
+    
+    def test_match_weather_location_rejects_times(self):
+        """Test that times and deictic words are never taken as the place in the fast path."""
+        self.assertEqual(app_module.match_weather_location("What's the weather in London today?"), "London")
+        for query in ("What's the weather for today?", "What's the weather for tomorrow?",
+                      "weather for now", "What's the weather for next week?", "weather in general",
+                      "What's the weather for tonight?", "weather for the weekend"):
+            self.assertIsNone(app_module.match_weather_location(query), query)
+    
+    @patch('src.app.weather_tool', MagicMock(api_key="test_key", units="metric"))
+    @patch('src.app.geocode_exact')
+    @patch('src.app.location_resolution_chain')
+    def test_chat_endpoint_fast_path_needs_a_known_place(self, mock_chain, mock_geocode_exact):
+        """Test that words the geocoding API doesn't know by that exact name go to the LLM."""
+        mock_geocode_exact.side_effect = lambda name, key: {"Paris": (48.8566, 2.3522)}.get(name)
+        mock_chain.arun = AsyncMock(return_value='{"location": "Unknown"}')
+        
+        for text in ("What's the weather at home?", "What's the weather for running?",
+                     "What's the weather in Paris in July?"):
+            mock_chain.arun.reset_mock()
+            response = self.client.post("/chat", json={"text": text})
+            self.assertEqual(response.status_code, 200)
+            mock_chain.arun.assert_called_once()
+        
+        # "home" is never looked up at all
+        self.assertNotIn("home", [call[0][0] for call in mock_geocode_exact.call_args_list])
+    
+    @patch('src.app.config')
+    def test_configure_logging_uses_config(self, mock_config):
+        """Test that api.debug turns on DEBUG logging for the app, and logging.level applies otherwise."""
+        settings = {"api.debug": True, "logging.level": "WARNING"}
+        mock_config.get.side_effect = lambda key, default=None: settings.get(key, default)
+        src_logger = logging.getLogger("src")
+        self.addCleanup(src_logger.setLevel, src_logger.level)
+        
+        app_module.configure_logging()
+        self.assertTrue(app_module.logger.isEnabledFor(logging.DEBUG))
+        
+        settings["api.debug"] = False
+        app_module.configure_logging()
+        self.assertFalse(app_module.logger.isEnabledFor(logging.INFO))
+        self.assertTrue(app_module.logger.isEnabledFor(logging.WARNING))
+    
+    def test_get_client_builds_clients_off_the_event_loop(self):
+        """Test that a client that isn't built yet is created in the threadpool, not on the event loop."""
+        threads = []
+        
+        def getter():
+            threads.append(threading.current_thread())
+            return "client"
+        
+        self.assertEqual(asyncio.run(app_module.get_client(getter)), "client")
+        self.assertIsNot(threads[0], threading.main_thread())
+        
+        # Once built, the client is returned directly
+        self.assertEqual(asyncio.run(app_module.get_client(getter)), "client")
+        self.assertIs(threads[1], threading.main_thread())
+    
+    @patch('src.app.geocode_variation')
+    def test_split_locations_keeps_names_containing_and(self, mock_geocode_variation):
+        """Test that a country with "and" in its name is one location, not two."""
+        coordinates = {
+            "Trinidad and Tobago": (10.6918, -61.2225),
+            "Trinidad": (-14.8333, -64.9),
+            "Tobago": (11.2333, -60.6667),
+            "Paris": (48.8566, 2.3522),
+            "Berlin": (52.52, 13.405),
+            "Bosnia": (44.0, 18.0)
+        }
+        mock_geocode_variation.side_effect = lambda location, key: coordinates.get(location)
+        
+        self.assertEqual(app_module.split_locations("Trinidad and Tobago", "key"), ["Trinidad and Tobago"])
+        self.assertEqual(app_module.split_locations("Paris and Berlin", "key"), ["Paris", "Berlin"])
+        self.assertEqual(app_module.split_locations("London", "key"), ["London"])
+        
+        # Unless every part is a place of its own, the name is kept whole
+        self.assertEqual(app_module.split_locations("Bosnia and Herzegovina", "key"), ["Bosnia and Herzegovina"])
+    
+    def test_preprocess_query(self):
+        """Test whitespace collapsing and question-mark handling of queries."""
+        self.assertEqual(app_module.preprocess_query("  what's the\tweather \n in London "),
+                         "what's the weather in London?")
+        self.assertEqual(app_module.preprocess_query("Is it cold?"), "Is it cold?")
+        # Only whole first words count, so "island" is not treated as "is"
+        self.assertEqual(app_module.preprocess_query("island weather"), "island weather")
+    
+    def test_clothing_recommendation_uses_weather_ids(self):
+        """Test that conditions come from OpenWeatherMap ids, not the description wording."""
+        # Sleet (611) is in the snow group; a thunderstorm forecast still calls for a raincoat
+        weather = {"main": {"temp": 1}, "weather": [{"id": 611, "description": "sleet"}], "wind": {"speed": 2}}
+        forecast = [{"dt": 0, "local_datetime": app_module.datetime(2024, 1, 1, 15),
+                     "main": {"temp": 5}, "weather": [{"id": 211, "description": "thunderstorm"}],
+                     "wind": {"speed": 2}}]
+        
+        result = app_module.get_clothing_recommendation(weather, forecast)
+        
+        self.assertIn("waterproof boots, warm, waterproof jacket", result)
+        self.assertIn("- Afternoon: winter coat or heavy jacket, hat and gloves, raincoat or umbrella.", result)
+    
+    @patch('src.app.weather_tool', MagicMock(api_key="test_key", units="metric"))
+    @patch('src.app.geocode_exact', return_value=(40.7128, -74.006))
+    @patch('src.app.get_forecast_by_coordinates')
+    @patch('src.app.get_weather_by_coordinates')
+    @patch('src.app.api_geocode_location')
+    @patch('src.app.location_resolution_chain')
+    def test_chat_endpoint_weather_query_with_time_skips_llm(self, mock_chain, mock_geocode,
+                                                             mock_get_weather, mock_get_forecast, mock_geocode_exact):
+        """Test that a trailing time of day is not taken as part of the location."""
+        mock_geocode.return_value = (40.7128, -74.006)
+        mock_get_weather.return_value = ("Weather in New York, US: clear sky.", None)
+        mock_get_forecast.return_value = ([], None)
+        mock_chain.arun = AsyncMock()
+        
+        response = self.client.post(
+            "/chat",
+            json={"text": "What's the weather in New York today?"}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_geocode.call_args[0][0], "New York")
+        mock_chain.arun.assert_not_called()
     
     def test_chat_endpoint_invalid_request(self):
         """Test the chat endpoint with invalid request data."""
@@ -110,19 +417,19 @@ class TestAPI(unittest.TestCase):
         )
         self.assertEqual(response.status_code, 422)  # Unprocessable Entity
     
-    @patch('src.app.LLMChain')
+    @patch('src.app.geocode_exact', return_value=None)
+    @patch('src.app.location_resolution_chain')
     @patch('src.app.api_geocode_location')
     @patch('src.app.llm_geocode_location')
-    def test_chat_endpoint_location_not_found(self, mock_llm_geocode, mock_api_geocode, mock_llm_chain):
+    def test_chat_endpoint_location_not_found(self, mock_llm_geocode, mock_api_geocode, mock_chain,
+                                              mock_geocode_exact):
         """Test the chat endpoint when location cannot be geocoded."""
         # Configure mocks
         mock_llm_geocode.return_value = None
         mock_api_geocode.return_value = None
         
-        # Mock LLMChain for location resolution
-        mock_chain_instance = MagicMock()
-        mock_chain_instance.run.return_value = '{"location": "NonExistentPlace"}'
-        mock_llm_chain.return_value = mock_chain_instance
+        # Mock the location resolution chain
+        mock_chain.arun = AsyncMock(return_value='{"location": "NonExistentPlace"}')
         
         # Make request
         response = self.client.post(
@@ -140,15 +447,17 @@ class TestAPI(unittest.TestCase):
         mock_llm_geocode.assert_called_once()
         mock_api_geocode.assert_called_once()
     
+    @patch('src.app.geocode_exact', return_value=(51.5074, -0.1278))
     @patch('src.app.get_forecast_by_coordinates')
     @patch('src.app.get_weather_by_coordinates')
     @patch('src.app.llm_geocode_location')
-    @patch('src.app.LLMChain')
-    def test_chat_endpoint_with_clothing_recommendations(self, mock_llm_chain, mock_geocode,
-                                                       mock_get_weather, mock_get_forecast):
+    @patch('src.app.api_geocode_location')
+    @patch('src.app.location_resolution_chain')
+    def test_chat_endpoint_with_clothing_recommendations(self, mock_chain, mock_api_geocode, mock_llm_geocode,
+                                                       mock_get_weather, mock_get_forecast, mock_geocode_exact):
         """Test the chat endpoint with weather query including clothing recommendations."""
         # Configure mocks
-        mock_geocode.return_value = (51.5074, -0.1278)  # London coordinates
+        mock_api_geocode.return_value = (51.5074, -0.1278)  # London coordinates
         
         # Mock weather data
         weather_data = {
@@ -185,11 +494,8 @@ class TestAPI(unittest.TestCase):
         
         mock_get_forecast.return_value = (forecast_data, {"list": forecast_data})
         
-        # Mock LLMChain for location resolution
-        mock_chain_instance = MagicMock()
-        # First call is for location resolution, second call might be for general query
-        mock_chain_instance.run.side_effect = ['{"location": "London"}', "Weather information for London"]
-        mock_llm_chain.return_value = mock_chain_instance
+        # Mock the location resolution chain
+        mock_chain.arun = AsyncMock(return_value='{"location": "London"}')
         
         # Make request
         response = self.client.post(
@@ -206,7 +512,110 @@ class TestAPI(unittest.TestCase):
         
         # Verify forecast was fetched
         mock_get_forecast.assert_called_once()
+        
+        # The geocoding API found the location, so the LLM fallback was never needed
+        mock_api_geocode.assert_called_once()
+        mock_llm_geocode.assert_not_called()
+    
+    @patch('src.app.get_forecast_by_coordinates')
+    @patch('src.app.get_weather_by_coordinates')
+    @patch('src.app.api_geocode_location')
+    @patch('src.app.location_resolution_chain')
+    def test_chat_endpoint_reuses_cached_location(self, mock_chain, mock_geocode,
+                                                  mock_get_weather, mock_get_forecast):
+        """Test that a repeated weather query skips location resolution and geocoding."""
+        mock_geocode.return_value = (51.5074, -0.1278)
+        mock_get_weather.return_value = ("Weather in London, GB: light rain.", None)
+        mock_get_forecast.return_value = ([], None)
+        
+        mock_chain.arun = AsyncMock(return_value='{"location": "London"}')
+        
+        for _ in range(2):
+            response = self.client.post(
+                "/chat",
+                json={"text": "Will it rain in London?"}
+            )
+            self.assertEqual(response.status_code, 200)
+            
+            # Bypass the whole-response cache so the weather is fetched again
+            app_module._response_cache.clear()
+        
+        # The LLM and geocoder are only asked once; the weather itself is fetched both times
+        mock_chain.arun.assert_called_once()
+        mock_geocode.assert_called_once()
+        self.assertEqual(mock_get_weather.call_count, 2)
+    
+    @patch('src.app.general_chain')
+    def test_chat_endpoint_reuses_cached_response(self, mock_chain):
+        """Test that a repeated query is answered from the response cache."""
+        mock_chain.arun = AsyncMock(return_value="Python is a programming language.")
+        
+        responses = [
+            self.client.post("/chat", json={"text": text})
+            for text in ("Tell me about Python", "  tell me about   python")
+        ]
+        
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["response"], "Python is a programming language.")
+        mock_chain.arun.assert_called_once()
+    
+    @patch('src.app.general_chain')
+    def test_chat_endpoint_compresses_large_responses(self, mock_chain):
+        """Test that long answers are gzip-compressed for clients that accept it."""
+        mock_chain.arun = AsyncMock(return_value="Python is a programming language. " * 50)
+        
+        response = self.client.post(
+            "/chat",
+            json={"text": "Tell me about Python"},
+            headers={"Accept-Encoding": "gzip"}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get("content-encoding"), "gzip")
+        self.assertEqual(response.json()["response"], mock_chain.arun.return_value)
+    
+    @patch('src.app.llm')
+    def test_chat_stream_endpoint_streams_general_answer(self, mock_llm):
+        """Test that general answers are streamed as NDJSON deltas."""
+        async def fake_astream(prompt_text):
+            for token in ["Python ", "is ", "great."]:
+                yield token
+        mock_llm.astream.side_effect = fake_astream
+        
+        response = self.client.post(
+            "/chat/stream",
+            json={"text": "Tell me about Python"}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["delta"] for line in lines], ["Python ", "is ", "great."])
+        self.assertIn("Tell me about Python", mock_llm.astream.call_args[0][0])
+    
+    @patch('src.app.geocode_exact', return_value=(51.5074, -0.1278))
+    @patch('src.app.get_forecast_by_coordinates')
+    @patch('src.app.get_weather_by_coordinates')
+    @patch('src.app.api_geocode_location')
+    @patch('src.app.location_resolution_chain')
+    def test_chat_stream_endpoint_weather_query(self, mock_chain, mock_geocode,
+                                                mock_get_weather, mock_get_forecast, mock_geocode_exact):
+        """Test that weather answers are sent as a single delta."""
+        mock_geocode.return_value = (51.5074, -0.1278)
+        mock_get_weather.return_value = ("Weather in London, GB: light rain.", None)
+        mock_get_forecast.return_value = ([], None)
+        mock_chain.arun = AsyncMock(return_value='{"location": "London"}')
+        
+        response = self.client.post(
+            "/chat/stream",
+            json={"text": "What's the weather in London?"}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertIn("light rain", lines[0]["delta"])
 
 if __name__ == "__main__":
     unittest.main()
-
@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import patch, MagicMock, call
+import os
+import sys
+
+# Add the project root to the path so we can import the script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import check_ollama
+
+class TestCheckOllama(unittest.TestCase):
+
+    def setUp(self):
+        check_ollama._TAGS_CACHE.clear()
+    
+    @patch('check_ollama._SESSION')
+    def test_liveness_check_only_sends_head(self, mock_session):
+        """Test that skipping model verification makes a single HEAD request."""
+        mock_session.head.return_value = MagicMock(status_code=200)
+        self.assertTrue(check_ollama.check_ollama(verify_model=False))
+        mock_session.get.assert_not_called()
+        
+        mock_session.head.return_value = MagicMock(status_code=503)
+        self.assertFalse(check_ollama.check_ollama(verify_model=False))
+    
+    @patch('check_ollama.time.sleep')
+    @patch('check_ollama.check_ollama')
+    def test_main_verifies_model_once_server_is_up(self, mock_check, mock_sleep):
+        """Test that main waits on the liveness probe before checking the model."""
+        # Down on the first attempt, then up with the model available
+        mock_check.side_effect = [False, True, True]
+        
+        with self.assertRaises(SystemExit) as cm:
+            check_ollama.main()
+        
+        self.assertEqual(cm.exception.code, 0)
+        self.assertEqual(mock_check.call_args_list,
+                         [call(verify_model=False), call(verify_model=False), call(force=True)])
+        mock_sleep.assert_called_once()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
+from collections.abc import Mapping
 import os
 import sys
 import json
@@ -7,11 +8,16 @@ import json
 # Add the src directory to the path so we can import our modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src import config as config_module
 from src.config import Config
 
 class TestConfig(unittest.TestCase):
     
     def setUp(self):
+        # Parsed files are cached across instances; start each test from disk
+        config_module._FILE_CACHE.clear()
+        Config._instances.clear()
+        
         # Sample config data for testing
         self.sample_config = {
             "api": {
@@ -38,7 +44,7 @@ class TestConfig(unittest.TestCase):
     @patch("dotenv.load_dotenv")
     @patch("builtins.open", new_callable=mock_open)
     @patch("os.path.exists")
-    @patch("json.load")
+    @patch("src.config._loads")
     def test_load_config_file(self, mock_json_load, mock_exists, mock_file_open, mock_load_dotenv):
         # Configure mocks
         mock_exists.return_value = True
@@ -48,7 +54,7 @@ class TestConfig(unittest.TestCase):
         config = Config("/fake/path/config.json")
         
         # Verify file was opened with the correct path
-        mock_file_open.assert_called_with("/fake/path/config.json", "r")
+        mock_file_open.assert_called_with("/fake/path/config.json", "rb")
         
         # Verify config was loaded
         self.assertEqual(config.get("api.port"), 8000)
@@ -78,12 +84,12 @@ class TestConfig(unittest.TestCase):
         # Verify the config is empty before environment overrides
         # Note: The _override_from_env method might still add some values from environment variables
         # So we can't strictly assert that config.config is completely empty
-        self.assertIsInstance(config.config, dict)
+        self.assertIsInstance(config.config, Mapping)
     
     @patch("dotenv.load_dotenv")
     @patch("os.getenv")
     @patch("os.path.exists")
-    @patch("json.load")
+    @patch("src.config._loads")
     def test_env_override(self, mock_json_load, mock_exists, mock_getenv, mock_load_dotenv):
         # Configure mocks
         mock_exists.return_value = True
@@ -92,6 +98,7 @@ class TestConfig(unittest.TestCase):
         # Mock environment variables
         mock_getenv.side_effect = lambda key, default=None: {
             "OLLAMA_MODEL": "mistral",
+            "PLANNER_OLLAMA_KEEP_ALIVE": "-1",
             "API_PORT": "9000",
             "OPENWEATHER_API_KEY": "test_key",
             "OLLAMA_BASE_URL": "http://custom-ollama:11434"
@@ -102,13 +109,14 @@ class TestConfig(unittest.TestCase):
         
         # Verify environment variables override config file
         self.assertEqual(config.get("ollama.default_model"), "mistral")
+        self.assertEqual(config.get("ollama.keep_alive"), -1)
         self.assertEqual(config.get("api.port"), 9000)
         self.assertEqual(config.get("weather.api_key"), "test_key")
         self.assertEqual(config.get("ollama.base_url"), "http://custom-ollama:11434")
     
     @patch("dotenv.load_dotenv")
     @patch("os.path.exists")
-    @patch("json.load")
+    @patch("src.config._loads")
     def test_default_config_path(self, mock_json_load, mock_exists, mock_load_dotenv):
         # Configure mocks
         mock_exists.return_value = True
@@ -125,6 +133,99 @@ class TestConfig(unittest.TestCase):
         mock_exists.assert_called()
         self.assertIn("config", mock_exists.call_args[0][0])
         self.assertIn("default_config.json", mock_exists.call_args[0][0])
+    
+    @patch("dotenv.load_dotenv")
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("os.path.exists")
+    @patch("src.config._loads")
+    def test_get_caches_lookups(self, mock_json_load, mock_exists, mock_file_open, mock_load_dotenv):
+        mock_exists.return_value = True
+        mock_json_load.return_value = self.sample_config
+        
+        config = Config("/fake/path/config.json")
+        
+        # Repeated lookups are answered from the cache
+        self.assertEqual(config.get("weather.units"), "metric")
+        self.assertIn("weather.units", config._get_cache)
+        self.assertEqual(config.get("weather.units"), "metric")
+        
+        # A cached miss still returns each caller's own default
+        self.assertIsNone(config.get("weather.missing"))
+        self.assertEqual(config.get("weather.missing", "fallback"), "fallback")
+    
+    @patch("dotenv.load_dotenv")
+    @patch("os.path.getmtime", return_value=1.0)
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("os.path.exists", return_value=True)
+    @patch("src.config._loads")
+    def test_config_file_is_parsed_once(self, mock_json_load, mock_exists, mock_file_open,
+                                        mock_getmtime, mock_load_dotenv):
+        mock_json_load.return_value = self.sample_config
+        
+        first = Config("/fake/path/config.json")
+        second = Config("/fake/path/config.json")
+        
+        # The same path gives back the already loaded instance
+        self.assertIs(first, second)
+        mock_json_load.assert_called_once()
+        self.assertEqual(second.get("api.port"), 8000)
+        
+        # A fresh instance shares the cached file, and its environment overrides never modify it
+        Config._instances.clear()
+        with patch("os.getenv", side_effect=lambda key, default=None: "9000" if key == "API_PORT" else default):
+            third = Config("/fake/path/config.json")
+        mock_json_load.assert_called_once()
+        self.assertEqual(third.get("api.port"), 9000)
+        self.assertEqual(third.config["api"]["host"], "0.0.0.0")
+        self.assertEqual(self.sample_config["api"]["port"], 8000)
+        
+        # A modified file is read again
+        mock_getmtime.return_value = 2.0
+        Config._instances.clear()
+        Config("/fake/path/config.json")
+        self.assertEqual(mock_json_load.call_count, 2)
+    
+    @patch("dotenv.load_dotenv")
+    @patch("os.path.getmtime", return_value=1.0)
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("os.path.exists", return_value=True)
+    @patch("src.config._loads")
+    def test_shared_config_is_read_only(self, mock_json_load, mock_exists, mock_file_open,
+                                        mock_getmtime, mock_load_dotenv):
+        mock_json_load.return_value = self.sample_config
+        
+        config = Config("/fake/path/config.json")
+        with self.assertRaises(TypeError):
+            config.get("api")["port"] = 1
+        
+        # The merged view is read-only too
+        with self.assertRaises(TypeError):
+            config.config["api"]["port"] = 1
+        
+        # set() overrides a value for this instance only
+        config.set("api.port", 1)
+        self.assertEqual(config.get("api.port"), 1)
+        self.assertEqual(config.config["api"]["port"], 1)
+        with self.assertRaises(ValueError):
+            config.set("api", 1)
+        
+        Config._instances.clear()
+        fresh = Config("/fake/path/config.json")
+        self.assertEqual(fresh.get("api.port"), 8000)
+        mock_json_load.assert_called_once()
+    
+    @patch("dotenv.load_dotenv")
+    @patch("os.path.exists", return_value=False)
+    def test_keep_alive_override(self, mock_exists, mock_load_dotenv):
+        # Durations stay strings and numbers of seconds become ints
+        with patch.dict(os.environ, {"PLANNER_OLLAMA_KEEP_ALIVE": "5m"}):
+            self.assertEqual(Config("/fake/a.json").get("ollama.keep_alive"), "5m")
+        with patch.dict(os.environ, {"PLANNER_OLLAMA_KEEP_ALIVE": "3600"}):
+            self.assertEqual(Config("/fake/b.json").get("ollama.keep_alive"), 3600)
+        
+        # The Ollama server's own variable is left alone
+        with patch.dict(os.environ, {"OLLAMA_KEEP_ALIVE": "-1"}, clear=True):
+            self.assertIsNone(Config("/fake/c.json").get("ollama.keep_alive"))
 
 if __name__ == "__main__":
     unittest.main()
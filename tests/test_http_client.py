@@ -0,0 +1,31 @@
+import unittest
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.http_client import create_session, DEFAULT_TIMEOUT
+
+class TestHttpClient(unittest.TestCase):
+    
+    def test_create_session_mounts_pooled_adapter(self):
+        """Test that both schemes share one pooled adapter with retries."""
+        session = create_session()
+        
+        http_adapter = session.get_adapter("http://api.openweathermap.org/geo/1.0/direct")
+        https_adapter = session.get_adapter("https://api.openweathermap.org/data/2.5/weather")
+        
+        self.assertIs(http_adapter, https_adapter)
+        self.assertEqual(https_adapter.poolmanager.connection_pool_kw["maxsize"], 64)
+        self.assertEqual(https_adapter.max_retries.total, 2)
+        self.assertEqual(https_adapter.max_retries.backoff_factor, 0.1)
+    
+    def test_default_timeout_bounds_connect_and_read(self):
+        """Test that callers get separate, finite connect and read timeouts."""
+        connect_timeout, read_timeout = DEFAULT_TIMEOUT
+        self.assertLess(connect_timeout, read_timeout)
+        self.assertLessEqual(read_timeout, 10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import os
+import sys
+
+# Add the src directory to the path so we can import our modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm_json import parse_llm_json, extract_json_object
+
+class TestLlmJson(unittest.TestCase):
+
+    def test_parse_llm_json_handles_fences_and_prose(self):
+        """Test that fenced answers and objects surrounded by prose are both parsed."""
+        self.assertEqual(parse_llm_json('```json\n{"location": "Paris"}\n```'), {"location": "Paris"})
+        self.assertEqual(parse_llm_json('Sure! {"location": "Oslo"} Anything else? {"x": 1}'),
+                         {"location": "Oslo"})
+        self.assertIsNone(parse_llm_json("no json here"))
+        self.assertIsNone(parse_llm_json(""))
+    
+    def test_parse_llm_json_checks_and_converts_keys(self):
+        """Test required keys and float conversion."""
+        text = '{"latitude": "51.5", "longitude": -0.12}'
+        self.assertEqual(parse_llm_json(text, ("latitude", "longitude"), ("latitude", "longitude")),
+                         {"latitude": 51.5, "longitude": -0.12})
+        self.assertIsNone(parse_llm_json('{"latitude": 51.5}', ("latitude", "longitude")))
+        self.assertIsNone(parse_llm_json('{"latitude": "north", "longitude": 1}', (), ("latitude",)))
+    
+    def test_extract_json_object_skips_braces_in_strings(self):
+        """Test that braces inside JSON strings don't end the object early."""
+        self.assertEqual(extract_json_object('x {"a": "}{"} y'), '{"a": "}{"}')
+        self.assertIsNone(extract_json_object('{"a": 1'))
+
+if __name__ == '__main__':
+    unittest.main()
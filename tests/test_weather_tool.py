@@ -37,7 +37,7 @@ class TestWeatherTool(unittest.TestCase):
             "wind": {"speed": 4.1}
         }
     
-    @patch('src.tools.weather_tool.requests.get')
+    @patch('src.tools.weather_tool.http_client.session.get')
     def test_get_weather_success(self, mock_get):
         # Configure the mock to return a successful response
         mock_response = MagicMock()
@@ -62,7 +62,39 @@ class TestWeatherTool(unittest.TestCase):
         self.assertEqual(kwargs['params']['units'], "metric")
         self.assertEqual(kwargs['params']['appid'], "test_api_key")
     
-    @patch('src.tools.weather_tool.requests.get')
+    @patch('src.tools.weather_tool.http_client.session.get')
+    def test_get_weather_is_cached(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = self.sample_weather_data
+        mock_get.return_value = mock_response
+        
+        first = self.weather_tool.get_weather("London")
+        second = self.weather_tool.get_weather(" london ")
+        
+        # The second lookup is served from the cache
+        self.assertEqual(first, second)
+        mock_get.assert_called_once()
+    
+    @patch('src.tools.weather_tool.http_client.session.get')
+    def test_get_weather_and_forecast(self, mock_get):
+        forecast_data = {"list": [{"dt": 1700000000, "main": {"temp": 12.0}}]}
+        
+        def fake_get(url, params=None, timeout=None):
+            mock_response = MagicMock()
+            mock_response.raise_for_status.return_value = None
+            mock_response.json.return_value = forecast_data if url.endswith("/forecast") else self.sample_weather_data
+            return mock_response
+        
+        mock_get.side_effect = fake_get
+        
+        current, forecast = self.weather_tool.get_weather_and_forecast("London")
+        
+        self.assertIn("London, GB", current)
+        self.assertEqual(forecast, forecast_data)
+        self.assertEqual(mock_get.call_count, 2)
+    
+    @patch('src.tools.weather_tool.http_client.session.get')
     def test_get_weather_api_error(self, mock_get):
         # Configure the mock to raise a RequestException
         mock_get.side_effect = requests.exceptions.RequestException("API Error")